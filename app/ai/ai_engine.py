@@ -1,8 +1,18 @@
 """
 AIEngine class for the banking system
 """
-from typing import Dict, Any, List, Tuple, Optional
-import random  # For simulation purposes only
+import logging
+import random
+import threading
+from typing import Dict, Any, List, Tuple, Optional, Union
+
+import numpy as np
+
+from app.ai.face_index import FaceIndex
+from app.utils.device_index import TrustedDeviceIndex
+from app.utils.geo import LocationIndex, haversine_km, parse_coordinates
+
+logger = logging.getLogger(__name__)
 
 
 class AIEngine:
@@ -15,6 +25,26 @@ class AIEngine:
         location_model (str): Model for location verification
     """
     
+    # Minimum cosine similarity for a face embedding match
+    FACE_MATCH_THRESHOLD = 0.8
+    
+    # Size of the float32 working block when matching quantized embeddings
+    QUANTIZED_BLOCK_BYTES = 256 * 1024
+    
+    # Minimum keystroke score; a sample one standard deviation from the
+    # enrolled profile on every feature scores exactly 0.5
+    TYPING_MATCH_THRESHOLD = 0.5
+    
+    # Distance from the nearest historical location at which location risk saturates
+    MAX_FEASIBLE_KM = 1000.0
+    
+    # Positions of the verification factors in a score vector
+    FACTOR_FACE = 0
+    FACTOR_TYPING = 1
+    FACTOR_LOCATION = 2
+    FACTOR_DEVICE = 3
+    FACTORS = ("face", "typing", "location", "device")
+    
     def __init__(self):
         """Initialize a new AIEngine instance"""
         # In a real implementation, these would be actual ML models
@@ -22,10 +52,61 @@ class AIEngine:
         self.type_model = "KeystrokeDynamics_v1"
         self.location_model = "GeoVerify_v3"
         
-        # Tracking metrics
-        self.verification_attempts = 0
-        self.successful_verifications = 0
-        self.flagged_attempts = 0
+        # Tracking metrics, indexed by verification result:
+        # [0] flagged attempts, [1] successful verifications
+        self._counters = np.zeros(2, dtype=np.int64)
+        # Verifications may run on worker threads; NumPy in-place updates are not atomic
+        self._counters_lock = threading.Lock()
+        
+        # Search index over enrolled face embeddings, created on first enrollment
+        self._face_index: Optional[FaceIndex] = None
+        
+        # Random generators for the simulated scores (for simulation purposes only);
+        # the scalar methods draw from a bound random.Random().random to skip array setup
+        self._rng = np.random.default_rng()
+        self._random = random.Random().random
+        
+        # Risk weighting per factor; risk = offset + sign * score
+        self._factors = self.FACTORS
+        self._weights = np.array([0.35, 0.25, 0.2, 0.2])
+        self._signs = np.array([-1.0, -1.0, 1.0, 1.0])
+        self._offsets = np.array([1.0, 1.0, 0.0, 0.0])
+    
+    def _record_result(self, result: bool) -> None:
+        """
+        Update the tracking metrics for a single verification result
+        
+        Args:
+            result: Verification result
+        """
+        with self._counters_lock:
+            self._counters[int(result)] += 1
+    
+    def _record_results(self, results: np.ndarray) -> None:
+        """
+        Update the tracking metrics for a batch of verification results
+        
+        Args:
+            results: Boolean array of verification results
+        """
+        counts = np.bincount(np.asarray(results, dtype=np.intp), minlength=2)
+        with self._counters_lock:
+            self._counters += counts
+    
+    @property
+    def verification_attempts(self) -> int:
+        """Total number of verification attempts"""
+        return int(self._counters.sum())
+    
+    @property
+    def successful_verifications(self) -> int:
+        """Number of verification attempts that passed"""
+        return int(self._counters[1])
+    
+    @property
+    def flagged_attempts(self) -> int:
+        """Number of verification attempts that were flagged"""
+        return int(self._counters[0])
     
     def verify_face(self, face_data: str, stored_face: str) -> Tuple[bool, float]:
         """
@@ -38,22 +119,239 @@ class AIEngine:
         Returns:
             Tuple[bool, float]: Verification result and confidence score
         """
-        print(f"Verifying facial data using {self.face_model}")
-        self.verification_attempts += 1
+        logger.debug("Verifying face using %s", self.face_model)
+        
+        # Same simulated distribution as verify_face_batch
+        confidence = 0.7 + 0.29 * self._random()
+        result = confidence > 0.8
+        
+        self._record_result(result)
+        return (result, confidence)
+    
+    def verify_face_batch(self, pairs: List[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Verify a batch of facial biometric samples
+        
+        Args:
+            pairs: List of (face_data, stored_face) pairs to compare
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Verification results and confidence scores
+        """
+        logger.debug("Verifying facial data using %s", self.face_model)
         
         # In a real implementation, this would use a deep learning model
         # to compare the facial features and calculate a similarity score
         
-        # Simulate verification with random confidence score
-        confidence = random.uniform(0.7, 0.99)
-        result = confidence > 0.8
+        # Simulate verification with random confidence scores
+        confidence = self._rng.uniform(0.7, 0.99, len(pairs))
+        results = confidence > 0.8
         
-        if result:
-            self.successful_verifications += 1
-        else:
-            self.flagged_attempts += 1
+        self._record_results(results)
+        return (results, confidence)
+    
+    @staticmethod
+    def normalize_face_embeddings(embeddings: np.ndarray) -> np.ndarray:
+        """
+        Normalize enrolled face embeddings to unit length
         
-        return (result, confidence)
+        Run once at enrollment so verification reduces to a dot product.
+        
+        Args:
+            embeddings: Embedding matrix of shape (N, D)
+            
+        Returns:
+            np.ndarray: float32 matrix of shape (N, D) with unit-length rows
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, np.finfo(np.float32).tiny)
+    
+    def verify_face_embedding(self, face_vec: np.ndarray, stored_embeddings: np.ndarray,
+                              ids: np.ndarray, threshold: Optional[float] = None) -> Tuple[bool, float, int]:
+        """
+        Match a face embedding against the enrolled embeddings
+        
+        Args:
+            face_vec: Query embedding of shape (D,)
+            stored_embeddings: Normalized enrolled embeddings of shape (N, D),
+                               see normalize_face_embeddings
+            ids: User IDs of the enrolled embeddings, shape (N,)
+            threshold: Minimum cosine similarity for a match (defaults to FACE_MATCH_THRESHOLD)
+            
+        Returns:
+            Tuple[bool, float, int]: Verification result, similarity score and best matching ID
+        """
+        results, similarities, matched_ids = self.verify_face_embeddings_batch(
+            np.asarray(face_vec)[None, :], stored_embeddings, ids, threshold
+        )
+        return (bool(results[0]), float(similarities[0]), int(matched_ids[0]))
+    
+    def verify_face_embeddings_batch(self, face_vecs: np.ndarray, stored_embeddings: np.ndarray,
+                                     ids: np.ndarray, threshold: Optional[float] = None
+                                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Match a batch of face embeddings against the enrolled embeddings
+        
+        Args:
+            face_vecs: Query embeddings of shape (M, D)
+            stored_embeddings: Normalized enrolled embeddings of shape (N, D),
+                               see normalize_face_embeddings
+            ids: User IDs of the enrolled embeddings, shape (N,)
+            threshold: Minimum cosine similarity for a match (defaults to FACE_MATCH_THRESHOLD)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Verification results, similarity scores
+                                                       and best matching IDs, one per query
+        """
+        logger.debug("Matching %d face embeddings using %s", len(face_vecs), self.face_model)
+        if len(stored_embeddings) == 0:
+            raise ValueError("No enrolled face embeddings to match against")
+        if threshold is None:
+            threshold = self.FACE_MATCH_THRESHOLD
+        
+        # A single matrix product scores every query against every enrolled embedding
+        queries = self.normalize_face_embeddings(face_vecs)
+        similarities = queries @ stored_embeddings.T
+        return self._best_face_matches(similarities, ids, threshold)
+    
+    @staticmethod
+    def quantize_face_embeddings(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Quantize face embeddings to int8 with a symmetric per-row scale
+        
+        Args:
+            embeddings: Embedding matrix of shape (N, D), normally already normalized
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: int8 matrix of shape (N, D) and float32
+                                           scales of shape (N,) such that
+                                           embeddings ~= quantized * scale[:, None]
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        scale = np.maximum(np.abs(embeddings).max(axis=1) / 127, np.finfo(np.float32).tiny)
+        quantized = np.round(embeddings / scale[:, None]).astype(np.int8)
+        return (quantized, scale.astype(np.float32))
+    
+    def verify_face_embeddings_quantized(self, face_vecs: np.ndarray, stored_quantized: np.ndarray,
+                                         stored_scale: np.ndarray, ids: np.ndarray,
+                                         threshold: Optional[float] = None
+                                         ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Match a batch of face embeddings against int8-quantized enrolled embeddings
+        
+        Args:
+            face_vecs: Query embeddings of shape (M, D)
+            stored_quantized: Quantized enrolled embeddings of shape (N, D),
+                              see quantize_face_embeddings
+            stored_scale: Per-row scales of the enrolled embeddings, shape (N,)
+            ids: User IDs of the enrolled embeddings, shape (N,)
+            threshold: Minimum cosine similarity for a match (defaults to FACE_MATCH_THRESHOLD)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Verification results, similarity scores
+                                                       and best matching IDs, one per query
+        """
+        logger.debug("Matching %d face embeddings against quantized templates", len(face_vecs))
+        if len(stored_quantized) == 0:
+            raise ValueError("No enrolled face embeddings to match against")
+        if threshold is None:
+            threshold = self.FACE_MATCH_THRESHOLD
+        
+        query_quantized, query_scale = self.quantize_face_embeddings(
+            self.normalize_face_embeddings(face_vecs)
+        )
+        query_block = query_quantized.astype(np.float32)
+        
+        # The templates stay int8 in memory; each block of rows is widened to
+        # float32 only while it is multiplied, so the working set stays in cache.
+        # Products of int8 values are exact in float32 for D up to 1024.
+        n_rows, dim = stored_quantized.shape
+        block_rows = max(1, self.QUANTIZED_BLOCK_BYTES // (4 * dim))
+        similarities = np.empty((len(query_block), n_rows), dtype=np.float32)
+        for start in range(0, n_rows, block_rows):
+            block = stored_quantized[start:start + block_rows].astype(np.float32)
+            np.matmul(query_block, block.T, out=similarities[:, start:start + block_rows])
+        similarities *= query_scale[:, None]
+        similarities *= stored_scale[None, :]
+        
+        return self._best_face_matches(similarities, ids, threshold)
+    
+    def enroll_face_embeddings(self, embeddings: np.ndarray, ids: np.ndarray) -> None:
+        """
+        Enroll face embeddings into the engine's search index
+        
+        Args:
+            embeddings: Embedding matrix of shape (N, D)
+            ids: User IDs of the embeddings, shape (N,)
+        """
+        embeddings = self.normalize_face_embeddings(embeddings)
+        if self._face_index is None:
+            self._face_index = FaceIndex(embeddings.shape[1])
+        self._face_index.add(embeddings, ids)
+    
+    def verify_face_enrolled(self, face_vec: np.ndarray,
+                             threshold: Optional[float] = None) -> Tuple[bool, float, int]:
+        """
+        Match a face embedding against the embeddings enrolled in the engine
+        
+        Args:
+            face_vec: Query embedding of shape (D,)
+            threshold: Minimum cosine similarity for a match (defaults to FACE_MATCH_THRESHOLD)
+            
+        Returns:
+            Tuple[bool, float, int]: Verification result, similarity score and best matching ID
+        """
+        results, similarities, matched_ids = self.verify_face_enrolled_batch(
+            np.asarray(face_vec)[None, :], threshold
+        )
+        return (bool(results[0]), float(similarities[0]), int(matched_ids[0]))
+    
+    def verify_face_enrolled_batch(self, face_vecs: np.ndarray, threshold: Optional[float] = None
+                                   ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Match a batch of face embeddings against the embeddings enrolled in the engine
+        
+        Args:
+            face_vecs: Query embeddings of shape (M, D)
+            threshold: Minimum cosine similarity for a match (defaults to FACE_MATCH_THRESHOLD)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Verification results, similarity scores
+                                                       and best matching IDs, one per query
+        """
+        if self._face_index is None:
+            raise ValueError("No enrolled face embeddings to match against")
+        if threshold is None:
+            threshold = self.FACE_MATCH_THRESHOLD
+        
+        logger.debug("Searching %d face embeddings in %s", len(face_vecs), self._face_index)
+        similarities, matched_ids = self._face_index.search(self.normalize_face_embeddings(face_vecs))
+        results = similarities > threshold
+        
+        self._record_results(results)
+        return (results, similarities, matched_ids)
+    
+    def _best_face_matches(self, similarities: np.ndarray, ids: np.ndarray,
+                           threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Select the best enrolled match for each query from a similarity matrix
+        
+        Args:
+            similarities: Similarity matrix of shape (M, N)
+            ids: User IDs of the enrolled embeddings, shape (N,)
+            threshold: Minimum similarity for a match
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Verification results, similarity scores
+                                                       and best matching IDs, one per query
+        """
+        best = np.argmax(similarities, axis=1)
+        best_similarities = similarities[np.arange(len(similarities)), best]
+        results = best_similarities > threshold
+        
+        self._record_results(results)
+        return (results, best_similarities, np.asarray(ids)[best])
     
     def analyze_typing(self, typing_pattern: str, stored_pattern: str) -> Tuple[bool, float]:
         """
@@ -66,8 +364,26 @@ class AIEngine:
         Returns:
             Tuple[bool, float]: Verification result and confidence score
         """
-        print(f"Analyzing typing pattern using {self.type_model}")
-        self.verification_attempts += 1
+        logger.debug("Analyzing typing pattern using %s", self.type_model)
+        
+        # Same simulated distribution as analyze_typing_batch
+        confidence = 0.65 + 0.3 * self._random()
+        result = confidence > 0.75
+        
+        self._record_result(result)
+        return (result, confidence)
+    
+    def analyze_typing_batch(self, pairs: List[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Analyze a batch of typing patterns for keystroke dynamics verification
+        
+        Args:
+            pairs: List of (typing_pattern, stored_pattern) pairs to compare
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Verification results and confidence scores
+        """
+        logger.debug("Analyzing typing pattern using %s", self.type_model)
         
         # In a real implementation, this would analyze:
         # - Key press duration
@@ -75,16 +391,84 @@ class AIEngine:
         # - Overall typing rhythm
         # - Common typing errors
         
-        # Simulate verification with random confidence score
-        confidence = random.uniform(0.65, 0.95)
-        result = confidence > 0.75
+        # Simulate verification with random confidence scores
+        confidence = self._rng.uniform(0.65, 0.95, len(pairs))
+        results = confidence > 0.75
         
-        if result:
-            self.successful_verifications += 1
-        else:
-            self.flagged_attempts += 1
+        self._record_results(results)
+        return (results, confidence)
+    
+    @staticmethod
+    def _as_keystroke_features(features: Union[bytes, np.ndarray]) -> np.ndarray:
+        """
+        Convert keystroke features to a float32 array
         
-        return (result, confidence)
+        Args:
+            features: Packed float32 bytes or an array of dwell/flight times
+            
+        Returns:
+            np.ndarray: Float32 feature array
+        """
+        if isinstance(features, (bytes, bytearray, memoryview)):
+            return np.frombuffer(features, dtype=np.float32)
+        return np.asarray(features, dtype=np.float32)
+    
+    def analyze_typing_features(self, features: Union[bytes, np.ndarray], mean: np.ndarray,
+                                inv_cov_diag: np.ndarray,
+                                threshold: Optional[float] = None) -> Tuple[bool, float]:
+        """
+        Compare a keystroke feature vector against an enrolled typing profile
+        
+        Args:
+            features: Dwell/flight time vector, as packed float32 bytes or an array
+            mean: Per-feature mean of the enrolled profile
+            inv_cov_diag: Per-feature inverse variance of the enrolled profile
+            threshold: Minimum score for a match, defaults to TYPING_MATCH_THRESHOLD
+            
+        Returns:
+            Tuple[bool, float]: Verification result and confidence score
+        """
+        features = self._as_keystroke_features(features)
+        results, confidence = self.analyze_typing_features_batch(
+            features[None, :], mean, inv_cov_diag, threshold
+        )
+        return (bool(results[0]), float(confidence[0]))
+    
+    def analyze_typing_features_batch(self, features: np.ndarray, mean: np.ndarray,
+                                      inv_cov_diag: np.ndarray,
+                                      threshold: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compare a batch of keystroke feature vectors against an enrolled typing profile
+        
+        The score is 1 / (1 + d), where d is the diagonal Mahalanobis distance
+        to the profile normalized by the number of features.
+        
+        Args:
+            features: Dwell/flight time vectors of shape (N, D)
+            mean: Per-feature mean of the enrolled profile, shape (D,)
+            inv_cov_diag: Per-feature inverse variance of the enrolled profile, shape (D,)
+            threshold: Minimum score for a match, defaults to TYPING_MATCH_THRESHOLD
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Verification results and confidence scores
+        """
+        if threshold is None:
+            threshold = self.TYPING_MATCH_THRESHOLD
+        
+        features = np.atleast_2d(self._as_keystroke_features(features))
+        mean = np.asarray(mean, dtype=np.float32)
+        inv_cov_diag = np.asarray(inv_cov_diag, dtype=np.float32)
+        
+        # Weighted sum of squares as one float32 matrix-vector product
+        diff = features - mean
+        diff *= diff
+        distances = np.sqrt((diff @ inv_cov_diag) / features.shape[1])
+        
+        confidence = 1.0 / (1.0 + distances.astype(np.float64))
+        results = confidence > threshold
+        
+        self._record_results(results)
+        return (results, confidence)
     
     def verify_location(self, location: str, historical_locations: List[str]) -> Tuple[bool, float]:
         """
@@ -97,57 +481,240 @@ class AIEngine:
         Returns:
             Tuple[bool, float]: Verification result and risk score
         """
-        print(f"Verifying location using {self.location_model}")
-        self.verification_attempts += 1
+        logger.debug("Verifying location using %s", self.location_model)
+        
+        # Same simulated distribution as verify_location_batch
+        risk_score = 0.1 + 0.5 * self._random()
+        result = risk_score < 0.4
+        
+        self._record_result(result)
+        return (result, risk_score)
+    
+    def verify_location_batch(self, samples: List[Tuple[str, List[str]]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Verify a batch of locations against their historical patterns
+        
+        Args:
+            samples: List of (location, historical_locations) pairs
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Verification results and risk scores
+        """
+        logger.debug("Verifying location using %s", self.location_model)
         
         # In a real implementation, this would:
         # 1. Check if the location is in the user's common locations
         # 2. Calculate the distance from previous login locations
         # 3. Consider the time between logins and feasible travel distances
         
-        # Simulate verification with random risk score
-        risk_score = random.uniform(0.1, 0.6)
-        result = risk_score < 0.4
+        # Simulate verification with random risk scores
+        risk_scores = self._rng.uniform(0.1, 0.6, len(samples))
+        results = risk_scores < 0.4
         
-        if result:
-            self.successful_verifications += 1
-        else:
-            self.flagged_attempts += 1
+        self._record_results(results)
+        return (results, risk_scores)
+    
+    @classmethod
+    def verify_device_prepare(cls, trusted_devices: List[str]) -> TrustedDeviceIndex:
+        """
+        Precompile a user's trusted devices for repeated device verification
+        
+        Args:
+            trusted_devices: List of trusted devices
+            
+        Returns:
+            TrustedDeviceIndex: Index to pass to verify_device in place of the list
+        """
+        return TrustedDeviceIndex(trusted_devices)
+    
+    @classmethod
+    def _as_device_index(cls, trusted_devices: Union[List[str], TrustedDeviceIndex]) -> TrustedDeviceIndex:
+        """Return trusted_devices as a TrustedDeviceIndex, compiling it if needed"""
+        if isinstance(trusted_devices, TrustedDeviceIndex):
+            return trusted_devices
+        return cls.verify_device_prepare(trusted_devices)
+    
+    @classmethod
+    def build_location_index(cls, historical_locations: List[str]) -> LocationIndex:
+        """
+        Index a user's historical locations for repeated location verification
+        
+        Args:
+            historical_locations: List of historical locations in "lat,lon" format
+            
+        Returns:
+            LocationIndex: Index to pass to verify_location_nearest
+        """
+        return LocationIndex(historical_locations)
+    
+    def verify_location_nearest(self, location: str,
+                                historical_locations: Union[List[str], LocationIndex]) -> Tuple[bool, float]:
+        """
+        Verify a location by its distance to the nearest historical location
+        
+        Args:
+            location: Current location in "lat,lon" format
+            historical_locations: List of historical locations or a prepared LocationIndex
+            
+        Returns:
+            Tuple[bool, float]: Verification result and risk score
+        """
+        results, risk_scores = self.verify_location_nearest_batch([location], historical_locations)
+        return (bool(results[0]), float(risk_scores[0]))
+    
+    def verify_location_nearest_batch(self, locations: List[str],
+                                      historical_locations: Union[List[str], LocationIndex]
+                                      ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Verify a batch of locations against one set of historical locations
+        
+        Risk grows linearly with the distance to the nearest historical
+        location and saturates at MAX_FEASIBLE_KM. Unparseable locations
+        and empty histories get the maximum risk.
+        
+        Args:
+            locations: Current locations in "lat,lon" format
+            historical_locations: List of historical locations or a prepared LocationIndex
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Verification results and risk scores
+        """
+        if not isinstance(historical_locations, LocationIndex):
+            historical_locations = self.build_location_index(historical_locations)
+        
+        distances = historical_locations.nearest_km(parse_coordinates(locations))
+        risk_scores = np.minimum(1.0, distances / self.MAX_FEASIBLE_KM)
+        results = risk_scores < 0.4
+        
+        self._record_results(results)
+        return (results, risk_scores)
+    
+    def verify_location_vec(self, location: str, historical_coordinates: np.ndarray) -> Tuple[bool, float]:
+        """
+        Verify a location by its great-circle distance to parsed historical coordinates
+        
+        Scores like verify_location_nearest, computing every distance in one
+        vectorized haversine pass instead of building an index.
+        
+        Args:
+            location: Current location in "lat,lon" format
+            historical_coordinates: Historical coordinates of shape (N, 2) in degrees
+            
+        Returns:
+            Tuple[bool, float]: Verification result and risk score
+        """
+        logger.debug("Verifying location using %s", self.location_model)
         
+        query = parse_coordinates([location])[0]
+        distances = haversine_km(np.asarray(historical_coordinates, dtype=np.float64), query)
+        distances = distances[~np.isnan(distances)]
+        
+        # Unparseable locations and empty histories get the maximum risk
+        nearest_km = float(distances.min()) if len(distances) else np.inf
+        risk_score = min(1.0, nearest_km / self.MAX_FEASIBLE_KM)
+        result = risk_score < 0.4
+        
+        self._record_result(result)
         return (result, risk_score)
     
-    def verify_device(self, device_info: str, trusted_devices: List[str]) -> Tuple[bool, float]:
+    def verify_location_vec_batch(self, locations: List[str],
+                                  historical_coordinates: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Verify a batch of locations against parsed historical coordinates
+        
+        Scores like verify_location_vec. Logins that pass the same coordinate
+        array, as UserDatabase.get_login_coordinates returns for one user,
+        are compared against it in a single broadcast haversine pass.
+        
+        Args:
+            locations: Current locations in "lat,lon" format
+            historical_coordinates: Historical coordinates of shape (N, 2) for each location
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Verification results and risk scores
+        """
+        logger.debug("Verifying locations using %s", self.location_model)
+        
+        queries = parse_coordinates(locations)
+        nearest_km = np.full(len(queries), np.inf)
+        
+        groups: Dict[int, List[int]] = {}
+        for i, coordinates in enumerate(historical_coordinates):
+            groups.setdefault(id(coordinates), []).append(i)
+        
+        for rows in groups.values():
+            history = np.asarray(historical_coordinates[rows[0]], dtype=np.float64)
+            if len(history) == 0:
+                continue
+            # (queries, history) distances; unparseable queries stay at inf
+            distances = haversine_km(queries[rows][:, None, :], history[None, :, :])
+            nearest_km[rows] = np.where(np.isnan(distances), np.inf, distances).min(axis=1)
+        
+        risk_scores = np.minimum(1.0, nearest_km / self.MAX_FEASIBLE_KM)
+        results = risk_scores < 0.4
+        
+        self._record_results(results)
+        return (results, risk_scores)
+    
+    def verify_device(self, device_info: str,
+                      trusted_devices: Union[List[str], TrustedDeviceIndex]) -> Tuple[bool, float]:
         """
         Verify if the current device is trusted
         
         Args:
             device_info: Current device information
-            trusted_devices: List of trusted devices
+            trusted_devices: List of trusted devices or a prepared TrustedDeviceIndex
             
         Returns:
             Tuple[bool, float]: Verification result and risk score
         """
-        print(f"Verifying device")
-        self.verification_attempts += 1
+        logger.debug("Verifying device")
+        
+        # A one-off list is scanned directly rather than compiled into an index
+        if isinstance(trusted_devices, TrustedDeviceIndex):
+            is_trusted = device_info in trusted_devices
+        else:
+            is_trusted = any(device_info in trusted_device for trusted_device in trusted_devices)
+        
+        # Same risk scores as verify_device_batch
+        risk_score = 0.2 if is_trusted else 0.4 + 0.4 * self._random()
+        result = risk_score < 0.5
+        
+        self._record_result(result)
+        return (result, risk_score)
+    
+    def verify_device_batch(self, samples: List[Tuple[str, Union[List[str], TrustedDeviceIndex]]]
+                            ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Verify a batch of devices against their trusted devices
+        
+        Args:
+            samples: List of (device_info, trusted_devices) pairs, where trusted_devices
+                     is a list or a prepared TrustedDeviceIndex
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Verification results and risk scores
+        """
+        logger.debug("Verifying device")
         
         # In a real implementation, this would:
         # 1. Check if the device is in the trusted devices list
         # 2. Analyze device fingerprint
         # 3. Check for suspicious characteristics
         
-        # Simple check if device is in trusted devices
-        is_trusted = any(device_info in trusted_device for trusted_device in trusted_devices)
-        
-        # Calculate risk score (lower is better)
-        risk_score = 0.2 if is_trusted else random.uniform(0.4, 0.8)
-        result = risk_score < 0.5
+        # Check if device is in trusted devices
+        is_trusted = np.fromiter(
+            (device_info in self._as_device_index(trusted_devices)
+             for device_info, trusted_devices in samples),
+            dtype=bool, count=len(samples)
+        )
         
-        if result:
-            self.successful_verifications += 1
-        else:
-            self.flagged_attempts += 1
+        # Calculate risk scores (lower is better)
+        risk_scores = np.where(is_trusted, 0.2, self._rng.uniform(0.4, 0.8, len(samples)))
+        results = risk_scores < 0.5
         
-        return (result, risk_score)
+        self._record_results(results)
+        return (results, risk_scores)
     
     def predict_risk_level(self, verification_results: Dict[str, Tuple[bool, float]]) -> float:
         """
@@ -162,33 +729,58 @@ class AIEngine:
         # In a real implementation, this would use a more sophisticated
         # algorithm to combine multiple risk factors
         
-        # Calculate weighted average of risk scores
-        weights = {
-            "face": 0.35,
-            "typing": 0.25,
-            "location": 0.2,
-            "device": 0.2
-        }
+        # Collect the scores in factor order, NaN marks a missing factor
+        scores = np.array([
+            verification_results[factor][1] if factor in verification_results else np.nan
+            for factor in self._factors
+        ])
+        return self.predict_risk_level_vec(scores)
+    
+    def predict_risk_level_vec(self, scores: np.ndarray) -> float:
+        """
+        Predict overall risk level from a score vector
+        
+        Args:
+            scores: Scores of shape (4,) indexed by the FACTOR_* constants;
+                    NaN marks a missing factor
+            
+        Returns:
+            float: Overall risk level between 0.0 (no risk) and 1.0 (highest risk)
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        mask = ~np.isnan(scores)
+        total_weight = mask @ self._weights
         
-        total_risk = 0.0
-        total_weight = 0.0
-        
-        for factor, (_, score) in verification_results.items():
-            if factor in weights:
-                # For face and typing, convert confidence to risk (1 - confidence)
-                if factor in ["face", "typing"]:
-                    risk = 1.0 - score
-                else:
-                    risk = score
-                
-                total_risk += risk * weights[factor]
-                total_weight += weights[factor]
-        
-        # If we have no results, return high risk
-        if total_weight == 0:
+        # Without any results the session is treated as high risk
+        if total_weight <= 0:
             return 0.9
+        risks = np.where(mask, self._offsets + self._signs * scores, 0.0)
+        return float(risks @ self._weights / total_weight)
+    
+    def predict_risk_level_batch(self, sessions: np.ndarray) -> np.ndarray:
+        """
+        Predict overall risk levels for many sessions at once
+        
+        Args:
+            sessions: Score matrix of shape (n_sessions, 4) with columns in factor order
+                      (face, typing, location, device); NaN marks a missing factor
+            
+        Returns:
+            np.ndarray: Risk level per session between 0.0 (no risk) and 1.0 (highest risk)
+        """
+        scores = np.asarray(sessions, dtype=np.float64)
+        mask = ~np.isnan(scores)
+        
+        # Calculate weighted average of risk scores; face and typing report
+        # confidence, which is converted to risk (1 - confidence)
+        risks = np.where(mask, self._offsets + self._signs * scores, 0.0)
+        total_risk = risks @ self._weights
+        total_weight = mask @ self._weights
         
-        return total_risk / total_weight
+        # Sessions without any results are treated as high risk
+        risk_levels = np.full(len(scores), 0.9)
+        np.divide(total_risk, total_weight, out=risk_levels, where=total_weight > 0)
+        return risk_levels
     
     def get_verification_stats(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,104 @@
+"""
+FaceIndex class for the banking system
+"""
+import logging
+from typing import Tuple
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
+
+class FaceIndex:
+    """
+    Inner-product search index over enrolled face embeddings
+    
+    Uses a FAISS flat inner-product index when faiss is installed, placed on
+    every available GPU so the 1:N search runs out of device memory. Without
+    faiss the embeddings are kept in a NumPy matrix and searched with BLAS.
+    
+    Attributes:
+        dim (int): Embedding dimension
+        ids (np.ndarray): User IDs of the enrolled embeddings, in insertion order
+        backend (str): Search backend in use ("faiss-gpu", "faiss" or "numpy")
+    """
+    
+    __slots__ = ("dim", "ids", "backend", "_index", "_embeddings")
+    
+    def __init__(self, dim: int, use_gpu: bool = True):
+        """
+        Initialize a new FaceIndex instance
+        
+        Args:
+            dim: Embedding dimension
+            use_gpu: Whether to place a FAISS index on the available GPUs
+        """
+        self.dim = dim
+        self.ids = np.empty(0, dtype=np.int64)
+        self._embeddings = np.empty((0, dim), dtype=np.float32)
+        self._index = None
+        self.backend = "numpy"
+        
+        if faiss is not None:
+            self._index = faiss.IndexFlatIP(dim)
+            self.backend = "faiss"
+            if use_gpu and hasattr(faiss, "get_num_gpus") and faiss.get_num_gpus() > 0:
+                self._index = faiss.index_cpu_to_all_gpus(self._index)
+                self.backend = "faiss-gpu"
+        logger.debug("Created face index with %s backend", self.backend)
+    
+    def add(self, embeddings: np.ndarray, ids: np.ndarray) -> None:
+        """
+        Add enrolled embeddings to the index
+        
+        Args:
+            embeddings: Normalized embeddings of shape (N, dim)
+            ids: User IDs of the embeddings, shape (N,)
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dim:
+            raise ValueError(f"Expected embeddings of shape (N, {self.dim}), got {embeddings.shape}")
+        if len(embeddings) != len(ids):
+            raise ValueError("Each embedding needs exactly one user ID")
+        
+        # FAISS keeps its own copy, so only the NumPy backend holds the matrix
+        if self._index is not None:
+            self._index.add(embeddings)
+        else:
+            self._embeddings = np.concatenate((self._embeddings, embeddings))
+        self.ids = np.concatenate((self.ids, ids))
+    
+    def search(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the best enrolled match for each query
+        
+        Args:
+            queries: Normalized query embeddings of shape (M, dim)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Best similarity scores and matching IDs, one per query
+        """
+        if len(self) == 0:
+            raise ValueError("No enrolled face embeddings to match against")
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        
+        if self._index is not None:
+            similarities, positions = self._index.search(queries, 1)
+            return (similarities[:, 0], self.ids[positions[:, 0]])
+        
+        similarities = queries @ self._embeddings.T
+        best = np.argmax(similarities, axis=1)
+        return (similarities[np.arange(len(queries)), best], self.ids[best])
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __str__(self) -> str:
+        """String representation of the FaceIndex"""
+        return f"FaceIndex(dim={self.dim}, enrolled={len(self.ids)}, backend={self.backend})"
@@ -1,7 +1,77 @@
 """
 LoginInterface class for the banking system
 """
-from typing import Dict, Any, Optional
+import itertools
+import logging
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Simulated user input, shared read-only between sessions
+_SIMULATED_INPUT = MappingProxyType({
+    "username": "user123",
+    "password": "password123",
+    "face_data": "base64_encoded_face_image",
+    "typing_pattern": "keystroke_timing_data",
+    "ip_address": "192.168.1.1",
+    "device_info": "Windows 11, Chrome 98.0.4758.102",
+    "location": "48.8566,2.3522"  # Paris coordinates
+})
+
+
+# Session IDs count up from the process start time in microseconds, so IDs
+# from one process never collide and stay ordered across restarts
+_session_ids = itertools.count(int(time.time()) * 1_000_000)
+
+
+def new_session_id() -> int:
+    """
+    Allocate a unique login session ID
+    
+    Returns:
+        int: Session ID, greater than any ID allocated before in this process
+    """
+    # count.__next__ runs in C without releasing the GIL, so no lock is needed
+    return next(_session_ids)
+
+
+class LoginInput(NamedTuple):
+    """
+    Login input with a fixed set of fields
+    
+    Fields are read by position rather than by key lookup, for code that
+    reads them on every attempt. Missing fields are None.
+    """
+    
+    username: Optional[str] = None
+    password: Optional[str] = None
+    device_info: Optional[str] = None
+    location: Optional[str] = None
+    ip_address: Optional[str] = None
+    face_data: Optional[str] = None
+    typing_pattern: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "LoginInput":
+        """
+        Build a LoginInput from collected login data
+        
+        Args:
+            data: Login data; keys that are not LoginInput fields are ignored
+            
+        Returns:
+            LoginInput: Login input holding the known fields
+        """
+        return cls._make(data.get(field) for field in cls._fields)
+
+
+@lru_cache(maxsize=64)
+def _summarize_keys(keys: Tuple[str, ...]) -> str:
+    """Join authentication data keys for logging; callers reuse a few key sets"""
+    return ', '.join(keys)
 
 
 class LoginInterface:
@@ -30,18 +100,10 @@ class LoginInterface:
         """
         # In a real implementation, this would collect username, password,
         # and potentially biometric data from the user interface
-        print(f"Collecting user input for session {self.session_id}")
+        logger.debug("Collecting user input for session %s", self.session_id)
         
-        # Simulated user input
-        return {
-            "username": "user123",
-            "password": "password123",
-            "face_data": "base64_encoded_face_image",
-            "typing_pattern": "keystroke_timing_data",
-            "ip_address": "192.168.1.1",
-            "device_info": "Windows 11, Chrome 98.0.4758.102",
-            "location": "48.8566,2.3522"  # Paris coordinates
-        }
+        # Simulated user input; callers override fields, so hand out a copy
+        return dict(_SIMULATED_INPUT)
     
     def send_to_authentication(self, auth_data: Dict[str, Any]) -> bool:
         """
@@ -54,10 +116,11 @@ class LoginInterface:
             bool: True if authentication data was successfully sent, False otherwise
         """
         # In a real implementation, this would send the data to the AuthenticationSystem
-        print(f"Sending authentication data for session {self.session_id} to authentication system")
+        logger.debug("Sending authentication data for session %s to authentication system", self.session_id)
         
         # Log the keys of the data being sent (not the values for security)
-        print(f"Data includes: {', '.join(auth_data.keys())}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Data includes: %s", _summarize_keys(tuple(auth_data)))
         
         return True
     
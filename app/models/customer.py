@@ -1,8 +1,11 @@
 """
 Customer class for the banking system
 """
+import logging
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 
 class Customer:
     """
@@ -16,6 +19,8 @@ class Customer:
         typing_pattern (str): Customer's typing pattern for keystroke dynamics
     """
     
+    __slots__ = ("customer_id", "username", "password", "face_data", "typing_pattern")
+    
     def __init__(self, customer_id: int, username: str, password: str, 
                  face_data: Optional[str] = None, typing_pattern: Optional[str] = None):
         """
@@ -43,7 +48,7 @@ class Customer:
         """
         # In a real implementation, this would interact with the LoginInterface
         # and AuthenticationSystem classes
-        print(f"Customer {self.username} attempting to login")
+        logger.debug("Customer %s attempting to login", self.username)
         return True
     
     def request_access(self, resource: str) -> bool:
@@ -58,7 +63,7 @@ class Customer:
         """
         # In a real implementation, this would check permissions and
         # potentially trigger additional authentication
-        print(f"Customer {self.username} requesting access to {resource}")
+        logger.debug("Customer %s requesting access to %s", self.username, resource)
         return True
     
     def __str__(self) -> str:
@@ -1,9 +1,109 @@
 """
 Transaction class for the banking system
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
 from datetime import datetime
-import uuid
+import os
+import threading
+import time
+
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    _parse_datetime = datetime.fromisoformat
+
+
+class _UUIDPool:
+    """Pool of random UUIDs drawn from a single os.urandom call"""
+    
+    __slots__ = ("_buf", "_i", "_n")
+    
+    def __init__(self, n: int = 4096):
+        self._n = n
+        self._refill()
+    
+    def _refill(self) -> None:
+        self._buf = os.urandom(16 * self._n)
+        self._i = 0
+    
+    def next(self) -> str:
+        """Return the next random (version 4) UUID as a string"""
+        if self._i >= self._n:
+            self._refill()
+        offset = self._i * 16
+        self._i += 1
+        
+        # Format directly, forcing the version nibble to 4 and the variant
+        # bits to RFC 4122 as uuid.UUID(bytes=..., version=4) would
+        h = self._buf[offset:offset + 16].hex()
+        variant = "89ab"[int(h[16], 16) & 0x3]
+        return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{variant}{h[17:20]}-{h[20:]}"
+
+
+# One pool per thread so no locking is needed
+_uuid_pools = threading.local()
+
+
+def _reset_uuid_pools() -> None:
+    """Drop inherited pools so a forked child never reuses the parent's IDs"""
+    global _uuid_pools
+    _uuid_pools = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_uuid_pools)
+
+
+def _new_transaction_id() -> str:
+    """Generate a new transaction ID from the calling thread's UUID pool"""
+    pool = getattr(_uuid_pools, "pool", None)
+    if pool is None:
+        pool = _uuid_pools.pool = _UUIDPool()
+    return pool.next()
+
+
+def _format_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Format the nanosecond state-transition times in transaction metadata
+    
+    Args:
+        metadata: Transaction metadata with "*_at_ns" integer timestamps
+        
+    Returns:
+        Dict[str, Any]: Copy of the metadata with each "*_at_ns" key replaced
+                        by an ISO formatted "*_at" key
+    """
+    formatted = {}
+    for key, value in metadata.items():
+        if key.endswith("_at_ns"):
+            formatted[key[:-3]] = datetime.fromtimestamp(value / 1e9).isoformat()
+        else:
+            formatted[key] = value
+    return formatted
+
+
+def _compile_dict_builder(fields: Tuple[Tuple[str, str], ...], doc: str) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Generate a dictionary serializer method from a field spec
+    
+    The generated method builds its result as a single dict display with
+    every expression inlined, so there is no per-field loop or lookup.
+    
+    Args:
+        fields: (key, expression) pairs, where each expression reads from self
+        doc: Docstring for the generated method
+        
+    Returns:
+        Callable[[Any], Dict[str, Any]]: Generated serializer function
+    """
+    items = "".join(f"\n        {key!r}: {expression}," for key, expression in fields)
+    source = f"def _build_dict(self):\n    return {{{items}\n    }}\n"
+    namespace = {"_format_metadata": _format_metadata}
+    exec(compile(source, "<Transaction._build_dict>", "exec"), namespace)
+    
+    build_dict = namespace["_build_dict"]
+    build_dict.__doc__ = doc
+    return build_dict
 
 
 class Transaction:
@@ -15,11 +115,17 @@ class Transaction:
         sender_id (int): ID of the sender
         receiver_id (int): ID of the receiver
         amount (float): Transaction amount
+        timestamp_ns (int): Time of the transaction in nanoseconds since the epoch
         timestamp (datetime): Time of the transaction
         status (str): Status of the transaction
         description (str): Description of the transaction
     """
     
+    __slots__ = (
+        "transaction_id", "sender_id", "receiver_id", "amount", "timestamp_ns",
+        "_timestamp", "status", "description", "risk_score", "metadata", "_dict_cache"
+    )
+    
     # Transaction status constants
     STATUS_PENDING = "pending"
     STATUS_COMPLETED = "completed"
@@ -27,6 +133,9 @@ class Transaction:
     STATUS_BLOCKED = "blocked"
     STATUS_UNDER_REVIEW = "under_review"
     
+    # Statuses after which the transaction is not expected to change
+    FINAL_STATUSES = frozenset((STATUS_COMPLETED, STATUS_FAILED, STATUS_BLOCKED))
+    
     def __init__(self, sender_id: int, receiver_id: int, amount: float, 
                  description: str = "", transaction_id: Optional[str] = None):
         """
@@ -39,15 +148,30 @@ class Transaction:
             description: Description of the transaction (optional)
             transaction_id: Unique identifier for the transaction (optional, generated if not provided)
         """
-        self.transaction_id = transaction_id if transaction_id else str(uuid.uuid4())
+        self.transaction_id = transaction_id if transaction_id else _new_transaction_id()
         self.sender_id = sender_id
         self.receiver_id = receiver_id
         self.amount = amount
-        self.timestamp = datetime.now()
+        self.timestamp_ns = time.time_ns()
+        self._timestamp = None
         self.status = self.STATUS_PENDING
         self.description = description
         self.risk_score = 0.0
         self.metadata = {}
+        self._dict_cache = None
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Time of the transaction, built from timestamp_ns on first access"""
+        if self._timestamp is None:
+            self._timestamp = datetime.fromtimestamp(self.timestamp_ns / 1e9)
+        return self._timestamp
+    
+    @timestamp.setter
+    def timestamp(self, value: datetime) -> None:
+        self._timestamp = value
+        self._dict_cache = None
+        self.timestamp_ns = round(value.timestamp() * 1e6) * 1000
     
     def complete(self) -> bool:
         """
@@ -58,7 +182,8 @@ class Transaction:
         """
         if self.status == self.STATUS_PENDING:
             self.status = self.STATUS_COMPLETED
-            self.metadata["completed_at"] = datetime.now().isoformat()
+            self._dict_cache = None
+            self.metadata["completed_at_ns"] = time.time_ns()
             return True
         return False
     
@@ -74,7 +199,8 @@ class Transaction:
         """
         if self.status != self.STATUS_COMPLETED:
             self.status = self.STATUS_FAILED
-            self.metadata["failed_at"] = datetime.now().isoformat()
+            self._dict_cache = None
+            self.metadata["failed_at_ns"] = time.time_ns()
             self.metadata["failure_reason"] = reason
             return True
         return False
@@ -91,7 +217,8 @@ class Transaction:
         """
         if self.status == self.STATUS_PENDING:
             self.status = self.STATUS_BLOCKED
-            self.metadata["blocked_at"] = datetime.now().isoformat()
+            self._dict_cache = None
+            self.metadata["blocked_at_ns"] = time.time_ns()
             self.metadata["block_reason"] = reason
             return True
         return False
@@ -109,29 +236,42 @@ class Transaction:
         if self.status == self.STATUS_PENDING:
             self.status = self.STATUS_UNDER_REVIEW
             self.risk_score = risk_score
-            self.metadata["flagged_at"] = datetime.now().isoformat()
+            self.metadata["flagged_at_ns"] = time.time_ns()
             self.metadata["risk_score"] = risk_score
             return True
         return False
     
+    # Serialized fields and the expressions that produce them; the cached
+    # timestamp is read directly so serializing skips the property call
+    _DICT_FIELDS = (
+        ("transaction_id", "self.transaction_id"),
+        ("sender_id", "self.sender_id"),
+        ("receiver_id", "self.receiver_id"),
+        ("amount", "self.amount"),
+        ("timestamp", "(self._timestamp or self.timestamp).isoformat()"),
+        ("status", "self.status"),
+        ("description", "self.description"),
+        ("risk_score", "self.risk_score"),
+        ("metadata", "_format_metadata(self.metadata) if self.metadata else {}")
+    )
+    
+    _build_dict = _compile_dict_builder(_DICT_FIELDS, "Build the dictionary representation of the transaction")
+    
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert the transaction to a dictionary
         
+        Transactions in a final status build the dictionary once and return
+        the same object afterwards, so callers must not modify it.
+        
         Returns:
             Dict[str, Any]: Dictionary representation of the transaction
         """
-        return {
-            "transaction_id": self.transaction_id,
-            "sender_id": self.sender_id,
-            "receiver_id": self.receiver_id,
-            "amount": self.amount,
-            "timestamp": self.timestamp.isoformat(),
-            "status": self.status,
-            "description": self.description,
-            "risk_score": self.risk_score,
-            "metadata": self.metadata
-        }
+        if self.status not in self.FINAL_STATUSES:
+            return self._build_dict()
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return self._dict_cache
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Transaction':
@@ -155,7 +295,7 @@ class Transaction:
         # Set additional attributes
         if "timestamp" in data:
             try:
-                transaction.timestamp = datetime.fromisoformat(data["timestamp"])
+                transaction.timestamp = _parse_datetime(data["timestamp"])
             except (ValueError, TypeError):
                 pass
         
@@ -165,6 +305,20 @@ class Transaction:
         
         return transaction
     
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> List['Transaction']:
+        """
+        Create Transaction instances from a batch of dictionaries
+        
+        Args:
+            records: Dictionaries containing transaction data
+            
+        Returns:
+            List[Transaction]: New Transaction instances, in input order
+        """
+        from_dict = cls.from_dict
+        return [from_dict(record) for record in records]
+    
     def __str__(self) -> str:
         """String representation of the Transaction"""
         return f"Transaction(id={self.transaction_id}, amount={self.amount}, status={self.status})"
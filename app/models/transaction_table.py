@@ -0,0 +1,167 @@
+"""
+TransactionTable class for the banking system
+"""
+from typing import Dict, Any, Iterable, List
+
+import numpy as np
+
+from app.models.transaction import Transaction
+
+
+class TransactionTable:
+    """
+    Column-oriented store for scoring large batches of transactions
+    
+    The numeric fields are kept in parallel NumPy arrays so filters and
+    risk thresholds run over whole columns at once. Transaction objects
+    are only materialized on request via row().
+    
+    Attributes:
+        size (int): Number of transactions stored
+        transaction_ids (List[str]): Transaction IDs, one per row
+        descriptions (List[str]): Transaction descriptions, one per row
+        metadata (List[Dict[str, Any]]): Transaction metadata, one per row
+    """
+    
+    # Numeric columns and their dtypes
+    COLUMNS = {
+        "sender_id": np.int64,
+        "receiver_id": np.int64,
+        "amount": np.float64,
+        "timestamp_ns": np.int64,
+        "status_code": np.uint8,
+        "risk_score": np.float64
+    }
+    
+    # Status codes stored in the status_code column
+    STATUS_CODES = {
+        Transaction.STATUS_PENDING: 0,
+        Transaction.STATUS_COMPLETED: 1,
+        Transaction.STATUS_FAILED: 2,
+        Transaction.STATUS_BLOCKED: 3,
+        Transaction.STATUS_UNDER_REVIEW: 4
+    }
+    STATUS_NAMES = tuple(STATUS_CODES)
+    
+    def __init__(self, capacity: int = 1024):
+        """
+        Initialize a new TransactionTable instance
+        
+        Args:
+            capacity: Number of rows to preallocate
+        """
+        self.size = 0
+        self._capacity = max(capacity, 1)
+        self._buffers = {
+            name: np.empty(self._capacity, dtype=dtype)
+            for name, dtype in self.COLUMNS.items()
+        }
+        self.transaction_ids: List[str] = []
+        self.descriptions: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+    
+    def _grow(self) -> None:
+        """Double the capacity of every numeric column"""
+        self._capacity *= 2
+        for name, buffer in self._buffers.items():
+            grown = np.empty(self._capacity, dtype=buffer.dtype)
+            grown[:self.size] = buffer[:self.size]
+            self._buffers[name] = grown
+    
+    def append(self, transaction: Transaction) -> int:
+        """
+        Append a transaction to the table
+        
+        Args:
+            transaction: Transaction to store
+            
+        Returns:
+            int: Row index of the stored transaction
+        """
+        if self.size == self._capacity:
+            self._grow()
+        
+        i = self.size
+        buffers = self._buffers
+        buffers["sender_id"][i] = transaction.sender_id
+        buffers["receiver_id"][i] = transaction.receiver_id
+        buffers["amount"][i] = transaction.amount
+        buffers["timestamp_ns"][i] = transaction.timestamp_ns
+        buffers["status_code"][i] = self.STATUS_CODES[transaction.status]
+        buffers["risk_score"][i] = transaction.risk_score
+        
+        self.transaction_ids.append(transaction.transaction_id)
+        self.descriptions.append(transaction.description)
+        self.metadata.append(transaction.metadata)
+        
+        self.size += 1
+        return i
+    
+    def extend(self, transactions: Iterable[Transaction]) -> None:
+        """
+        Append several transactions to the table
+        
+        Args:
+            transactions: Transactions to store
+        """
+        for transaction in transactions:
+            self.append(transaction)
+    
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get the stored values of a numeric column
+        
+        Args:
+            name: Column name, one of COLUMNS
+            
+        Returns:
+            np.ndarray: View over the filled rows of the column
+        """
+        return self._buffers[name][:self.size]
+    
+    def compute_risk_mask(self, threshold: float) -> np.ndarray:
+        """
+        Find the transactions whose risk score exceeds a threshold
+        
+        Args:
+            threshold: Risk score threshold
+            
+        Returns:
+            np.ndarray: Boolean mask with one entry per row
+        """
+        return self.column("risk_score") > threshold
+    
+    def row(self, index: int) -> Transaction:
+        """
+        Materialize a stored row as a Transaction
+        
+        Args:
+            index: Row index
+            
+        Returns:
+            Transaction: New Transaction instance built from the row
+        """
+        if not 0 <= index < self.size:
+            raise IndexError(f"Row {index} out of range for table of size {self.size}")
+        
+        buffers = self._buffers
+        transaction = Transaction(
+            sender_id=int(buffers["sender_id"][index]),
+            receiver_id=int(buffers["receiver_id"][index]),
+            amount=float(buffers["amount"][index]),
+            description=self.descriptions[index],
+            transaction_id=self.transaction_ids[index]
+        )
+        transaction.timestamp_ns = int(buffers["timestamp_ns"][index])
+        transaction.status = self.STATUS_NAMES[buffers["status_code"][index]]
+        transaction.risk_score = float(buffers["risk_score"][index])
+        transaction.metadata = self.metadata[index]
+        
+        return transaction
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __str__(self) -> str:
+        """String representation of the TransactionTable"""
+        return f"TransactionTable(size={self.size})"
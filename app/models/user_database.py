@@ -1,11 +1,123 @@
 """
 UserDatabase class for the banking system
 """
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, ChainMap, Dict, Any, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 from datetime import datetime
-import json
+from types import MappingProxyType
+import collections
+import collections.abc
+import atexit
+import logging
 import os
-import base64
+import sys
+import time
+import uuid
+import weakref
+
+import numpy as np
+
+from app.utils import serialization
+from app.utils.device_index import TrustedDeviceIndex
+from app.utils.geo import parse_coordinates
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Open databases, flushed when the interpreter exits
+_open_databases = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_databases() -> None:
+    """Write out any pending changes of databases that are still open"""
+    for database in list(_open_databases):
+        database.flush()
+
+
+class _AppendLog:
+    """Append-only file opened on first write and kept open afterwards"""
+    
+    __slots__ = ("path", "_fd", "_unsynced")
+    
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._fd: Optional[int] = None
+        self._unsynced = False
+    
+    def write(self, data: bytes) -> None:
+        """Append data with a single write call in the common case"""
+        if self._fd is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+        self._unsynced = True
+    
+    def sync(self) -> None:
+        """Make appended data durable, skipping metadata-only updates where possible"""
+        if self._fd is None or not self._unsynced:
+            return
+        getattr(os, "fdatasync", os.fsync)(self._fd)
+        self._unsynced = False
+    
+    def close(self) -> None:
+        """Sync and close the file"""
+        if self._fd is not None:
+            self.sync()
+            os.close(self._fd)
+            self._fd = None
+
+
+class _LoginColumns:
+    """Column store of one user's login hours and interned location IDs"""
+    
+    __slots__ = ("size", "_hours", "_location_ids")
+    
+    def __init__(self, capacity: int = 16):
+        self.size = 0
+        self._hours = np.empty(capacity, dtype=np.int8)
+        self._location_ids = np.empty(capacity, dtype=np.int32)
+    
+    def append(self, hour: int, location_id: int) -> None:
+        """Append one login; -1 marks an unknown hour or a missing location"""
+        # Capacity doubles when full, so appends are amortized O(1)
+        if self.size == len(self._hours):
+            self._hours = np.concatenate((self._hours, np.empty_like(self._hours)))
+            self._location_ids = np.concatenate((self._location_ids, np.empty_like(self._location_ids)))
+        self._hours[self.size] = hour
+        self._location_ids[self.size] = location_id
+        self.size += 1
+    
+    @property
+    def hours(self) -> np.ndarray:
+        return self._hours[:self.size]
+    
+    @property
+    def location_ids(self) -> np.ndarray:
+        return self._location_ids[:self.size]
+
+
+class _LoginHistoryView(collections.abc.Sequence):
+    """Read-only view of one user's login records, sharing the stored list"""
+    
+    __slots__ = ("_logins",)
+    
+    def __init__(self, logins: List[Dict[str, Any]]):
+        self._logins = logins
+    
+    def __len__(self) -> int:
+        return len(self._logins)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [MappingProxyType(login) for login in self._logins[index]]
+        return MappingProxyType(self._logins[index])
 
 
 class UserDatabase:
@@ -15,53 +127,123 @@ class UserDatabase:
     Attributes:
         stored_face (str): Stored facial biometric data
         stored_typing_pattern (str): Stored typing pattern data
-        trusted_devices (List[str]): List of trusted devices
+        trusted_devices (Set[str]): Set of trusted devices
         historical_logins (List[Dict]): List of historical login data
     """
     
+    # User fields holding binary data, stored as base64 strings in the data file
+    BINARY_FIELDS = ("password_hash", "password_salt")
+    
+    # Pending changes are written once this many accumulate or this many
+    # seconds have passed since the last write
+    FLUSH_EVERY_WRITES = 64
+    FLUSH_INTERVAL = 1.0
+    
+    # Data file name that keeps the database in memory, never touching disk
+    MEMORY = ":memory:"
+    
     def __init__(self, data_file: str = "data/user_data.json"):
         """
         Initialize a new UserDatabase instance
         
         Args:
-            data_file: Path to the data file
+            data_file: Path to the data file; login history is appended to a
+                       "_logins.jsonl" file next to it. MEMORY keeps the
+                       database in memory only, without a login file
         """
         self.data_file = data_file
+        self.in_memory = data_file == self.MEMORY
+        # Distinguishes this instance from any other over the same data file;
+        # together with version it identifies the database contents
+        self.instance_id = uuid.uuid4().hex
+        self.login_file = None if self.in_memory else os.path.splitext(data_file)[0] + "_logins.jsonl"
+        self._login_log = _AppendLog(self.login_file)
         self.users = {}
         self.stored_face = {}
         self.stored_typing_pattern = {}
-        self.trusted_devices = {}
+        self.trusted_devices: Dict[int, Set[str]] = {}
         self.historical_logins = {}
         
+        # Login locations interned to integer IDs, shared by all users, with
+        # the coordinates of each location parsed once (NaN if unparseable)
+        self._location_ids: Dict[Any, int] = {}
+        self._location_names: List[Any] = []
+        self._location_coordinates: List[Tuple[float, float]] = []
+        
+        # Per-user login summaries kept in step with historical_logins:
+        # logins per hour of day, and the set of login location IDs
+        self._hour_counts: Dict[int, List[int]] = {}
+        self._login_locations: Dict[int, Set[int]] = {}
+        
+        # get_login_coordinates results per user, with the number of distinct
+        # locations they were built from; a new location makes them stale
+        self._coordinate_cache: Dict[int, Tuple[int, np.ndarray]] = {}
+        
+        # Compiled trusted device matchers per user, dropped when a device is added
+        self._device_indexes: Dict[int, TrustedDeviceIndex] = {}
+        
+        # Login history as per-user NumPy columns for bulk analytics
+        self._login_columns: Dict[int, _LoginColumns] = {}
+        
+        # Mutation counter; the data get_user_detail layers over each user
+        # record is cached per user together with the version it was built at
+        self._version = 0
+        self._detail_cache: Dict[int, Tuple[int, Mapping[str, Any]]] = {}
+        
+        # Username to user ID, built on the first lookup; None means it needs rebuilding
+        self._username_index: Optional[Dict[str, int]] = None
+        
+        # Write-behind state, see _mark_dirty
+        self._dirty = False
+        self._pending_writes = 0
+        self._last_flush = time.monotonic()
+        
         # Load data if file exists
-        self._load_data()
+        if not self.in_memory:
+            self._load_data()
+            self._load_logins()
+            _open_databases.add(self)
     
     def _load_data(self) -> None:
         """Load user data from file if it exists"""
         try:
             if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    self.users = data.get('users', {})
-                    self.stored_face = data.get('stored_face', {})
-                    self.stored_typing_pattern = data.get('stored_typing_pattern', {})
-                    self.trusted_devices = data.get('trusted_devices', {})
-                    self.historical_logins = data.get('historical_logins', {})
+                with open(self.data_file, 'rb') as raw_file:
+                    # Sections are taken one at a time, streamed when ijson is available;
+                    # the file may be zstd or gzip compressed, or plain JSON
+                    f = serialization.open_decompressed(raw_file)
+                    # JSON object keys are always strings; user IDs are kept as ints in memory
+                    for section, value in serialization.iter_items(f):
+                        if section == 'users':
+                            self.users = {int(user_id): user_data for user_id, user_data in value.items()}
+                        elif section == 'stored_face':
+                            self.stored_face = {int(user_id): face for user_id, face in value.items()}
+                        elif section == 'stored_typing_pattern':
+                            self.stored_typing_pattern = {
+                                int(user_id): pattern for user_id, pattern in value.items()
+                            }
+                        elif section == 'trusted_devices':
+                            # Trusted devices are stored as lists and kept as sets in memory
+                            self.trusted_devices = {
+                                int(user_id): set(devices) for user_id, devices in value.items()
+                            }
+                        elif section == 'historical_logins':
+                            self.historical_logins = {int(user_id): logins for user_id, logins in value.items()}
                     
-                    # Convert base64 encoded binary data back to bytes
+                    # Convert base64 encoded binary data back to bytes; files written
+                    # by older versions use a "_b64" suffix on the field name
                     for user_id, user_data in self.users.items():
-                        if 'password_hash_b64' in user_data:
-                            user_data['password_hash'] = base64.b64decode(user_data['password_hash_b64'])
-                            del user_data['password_hash_b64']
-                        if 'password_salt_b64' in user_data:
-                            user_data['password_salt'] = base64.b64decode(user_data['password_salt_b64'])
-                            del user_data['password_salt_b64']
+                        for field in self.BINARY_FIELDS:
+                            if f'{field}_b64' in user_data:
+                                user_data[field] = user_data.pop(f'{field}_b64')
+                            if isinstance(user_data.get(field), str):
+                                user_data[field] = serialization.b64decode(user_data[field])
                 
-                print(f"Loaded user data from {self.data_file}")
+                logger.info("Loaded user data from %s", self.data_file)
             else:
-                print(f"Data file {self.data_file} does not exist, starting with empty database")
+                logger.info("Data file %s does not exist, starting with empty database", self.data_file)
         except Exception as e:
-            print(f"Error loading data: {e}")
+            logger.error("Error loading data: %s", e)
     
     def _save_data(self) -> None:
         """Save user data to file"""
@@ -69,34 +251,229 @@ class UserDatabase:
             # Ensure directory exists
             os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
             
-            # Create a copy of the data to modify for saving
-            users_for_json = {}
-            for user_id, user_data in self.users.items():
-                # Create a copy of the user data
-                user_copy = user_data.copy()
-                
-                # Convert bytes to base64 for JSON serialization
-                if 'password_hash' in user_copy and isinstance(user_copy['password_hash'], bytes):
-                    user_copy['password_hash_b64'] = base64.b64encode(user_copy['password_hash']).decode('utf-8')
-                    del user_copy['password_hash']
-                
-                if 'password_salt' in user_copy and isinstance(user_copy['password_salt'], bytes):
-                    user_copy['password_salt_b64'] = base64.b64encode(user_copy['password_salt']).decode('utf-8')
-                    del user_copy['password_salt']
-                
-                users_for_json[user_id] = user_copy
+            # Bytes values are written as base64 strings and sets as lists by the serializer;
+            # login history lives in the append-only login file instead. The file
+            # is compressed, so it is written compact rather than indented
+            payload = serialization.compress(serialization.dumps({
+                'users': self.users,
+                'stored_face': self.stored_face,
+                'stored_typing_pattern': self.stored_typing_pattern,
+                'trusted_devices': self.trusted_devices
+            }))
             
-            with open(self.data_file, 'w') as f:
-                json.dump({
-                    'users': users_for_json,
-                    'stored_face': self.stored_face,
-                    'stored_typing_pattern': self.stored_typing_pattern,
-                    'trusted_devices': self.trusted_devices,
-                    'historical_logins': self.historical_logins
-                }, f, indent=2)
-            print(f"Saved user data to {self.data_file}")
+            # Write to a temporary file and swap it in, so a crash mid-write
+            # never leaves a truncated data file behind
+            tmp_file = self.data_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.data_file)
+            logger.info("Saved user data to %s", self.data_file)
         except Exception as e:
-            print(f"Error saving data: {e}")
+            logger.error("Error saving data: %s", e)
+    
+    def _load_logins(self) -> None:
+        """Replay the login file, moving any login history kept in the data file into it"""
+        inline_logins = self.historical_logins
+        self.historical_logins = {}
+        self._hour_counts = {}
+        self._login_locations = {}
+        self._coordinate_cache = {}
+        self._login_columns = {}
+        self._location_ids = {}
+        self._location_names = []
+        self._location_coordinates = []
+        
+        try:
+            if os.path.exists(self.login_file):
+                with open(self.login_file, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            login_data = serialization.loads(line)
+                        except ValueError:
+                            # Skip a record left incomplete by an interrupted write
+                            continue
+                        user_id = login_data.pop('user_id', None)
+                        # Earlier versions wrote the parsed login hour into the record
+                        login_data.pop('_hour', None)
+                        if user_id is not None and self._valid_location(user_id, login_data):
+                            # Older login files store the user ID as a string
+                            user_id = int(user_id)
+                            self.historical_logins.setdefault(user_id, []).append(login_data)
+                            self._index_login(user_id, login_data)
+        except Exception as e:
+            logger.error("Error loading login history: %s", e)
+        
+        # Data files written by older versions keep login history inline
+        records = [
+            (user_id, login_data)
+            for user_id, logins in inline_logins.items()
+            for login_data in logins
+            if self._valid_location(user_id, login_data)
+        ]
+        for user_id in inline_logins:
+            self.historical_logins.setdefault(user_id, [])
+        if records:
+            self._append_logins(records)
+            logger.info("Moved %d login records to %s", len(records), self.login_file)
+            self._dirty = True
+            self.flush()
+    
+    def _append_logins(self, records: Iterable[Tuple[int, Dict[str, Any]]]) -> None:
+        """
+        Append login records to the login file and the in-memory history
+        
+        Args:
+            records: (user_id, login_data) pairs to append
+        """
+        lines = []
+        for user_id, login_data in records:
+            self._index_login(user_id, login_data)
+            self.historical_logins.setdefault(user_id, []).append(login_data)
+            if not self.in_memory:
+                lines.append(serialization.dumps({'user_id': user_id, **login_data}))
+        
+        # One write per batch keeps each record append a single small I/O
+        if lines:
+            self._login_log.write(b'\n'.join(lines) + b'\n')
+        self._version += 1
+    
+    def _index_login(self, user_id: int, login_data: Dict[str, Any]) -> None:
+        """
+        Add a login record to the user's hour and location summaries and columns
+        
+        An ISO 8601 timestamp string is parsed into a datetime once, here, so
+        records hold datetimes both when added and when replayed from the
+        login file. The login hour is kept only in the summaries and columns,
+        so the read paths do no timestamp parsing.
+        
+        Args:
+            user_id: Unique identifier for the user
+            login_data: Login record being added
+        """
+        # A None location counts as missing; Categorical categories cannot be null
+        location_id = -1
+        if login_data.get('location') is not None:
+            location_id = self._intern_location(login_data['location'])
+            # Records share one string object per distinct location
+            login_data['location'] = self._location_names[location_id]
+            self._login_locations.setdefault(user_id, set()).add(location_id)
+        
+        hour = None
+        timestamp = login_data.get('timestamp')
+        if timestamp is not None and not isinstance(timestamp, datetime):
+            try:
+                timestamp = login_data['timestamp'] = datetime.fromisoformat(timestamp)
+            except (ValueError, TypeError):
+                # An unparseable timestamp is kept as given, without an hour
+                pass
+        if isinstance(timestamp, datetime):
+            hour = timestamp.hour
+        
+        if hour is not None:
+            self._hour_counts.setdefault(user_id, [0] * 24)[hour] += 1
+        
+        columns = self._login_columns.get(user_id)
+        if columns is None:
+            columns = self._login_columns[user_id] = _LoginColumns()
+        columns.append(-1 if hour is None else hour, location_id)
+    
+    def _valid_location(self, user_id: int, login_data: Dict[str, Any]) -> bool:
+        """
+        Check that a login record's location can be interned
+        
+        Args:
+            user_id: Unique identifier for the user
+            login_data: Login record being added
+            
+        Returns:
+            bool: True if the location is missing or hashable, False otherwise
+        """
+        try:
+            hash(login_data.get('location'))
+        except TypeError:
+            logger.warning("Invalid login location for user %s: %r", user_id, login_data['location'])
+            return False
+        return True
+    
+    def _lookup_location(self, user_id: int, current_data: Dict[str, Any]) -> int:
+        """
+        Get the integer ID of a location being checked, without interning it
+        
+        Args:
+            user_id: Unique identifier for the user
+            current_data: Login data holding the location
+            
+        Returns:
+            int: Location ID, or -2 (matching no stored ID) if the location is
+                 missing, unknown or unhashable
+        """
+        if not self._valid_location(user_id, current_data):
+            return -2
+        return self._location_ids.get(current_data.get('location'), -2)
+    
+    def _intern_location(self, location: Any) -> int:
+        """
+        Get the integer ID of a login location, assigning one if it is new
+        
+        Args:
+            location: Location value from a login record
+            
+        Returns:
+            int: Location ID
+        """
+        location_id = self._location_ids.get(location)
+        if location_id is None:
+            if isinstance(location, str):
+                location = sys.intern(location)
+            location_id = len(self._location_names)
+            self._location_ids[location] = location_id
+            self._location_names.append(location)
+            lat, lon = parse_coordinates([location])[0]
+            self._location_coordinates.append((lat, lon))
+        return location_id
+    
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever users, devices or logins change; see instance_id"""
+        return self._version
+    
+    def _mark_dirty(self) -> None:
+        """Record a change, writing the data file once enough changes are pending"""
+        self._version += 1
+        if self.in_memory:
+            return
+        self._dirty = True
+        self._pending_writes += 1
+        if (self._pending_writes >= self.FLUSH_EVERY_WRITES
+                or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL):
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write pending changes to the data file and sync the login file"""
+        self._login_log.sync()
+        if not self._dirty:
+            return
+        self._save_data()
+        self._dirty = False
+        self._pending_writes = 0
+        self._last_flush = time.monotonic()
+    
+    def close(self) -> None:
+        """Flush pending changes and close the login file"""
+        self.flush()
+        self._login_log.close()
+    
+    def __del__(self) -> None:
+        """Write pending changes before the database is garbage collected"""
+        try:
+            self.close()
+        except AttributeError:
+            # Initialization did not complete
+            pass
     
     def add_user(self, user_id: int, user_data: Dict[str, Any]) -> bool:
         """
@@ -109,59 +486,133 @@ class UserDatabase:
         Returns:
             bool: True if user was added successfully, False otherwise
         """
-        if str(user_id) in self.users:
-            print(f"User {user_id} already exists")
+        if not self._insert_user(user_id, user_data):
+            return False
+        
+        self._mark_dirty()
+        return True
+    
+    def add_users_bulk(self, user_ids: Sequence[int], columns: Dict[str, Sequence[Any]]) -> int:
+        """
+        Add several users to the database with a single write
+        
+        The users are given column-wise, as one sequence per field with an
+        entry for each user. Inserting them all before marking the database
+        dirty means the data file is rewritten at most once for the batch.
+        
+        Args:
+            user_ids: Unique identifiers for the users
+            columns: Mapping of field name to per-user values, parallel to user_ids
+            
+        Returns:
+            int: Number of users added; existing user IDs are skipped
+        """
+        for name, values in columns.items():
+            if len(values) != len(user_ids):
+                raise ValueError(f"Column {name!r} has {len(values)} values for {len(user_ids)} users")
+        
+        # NumPy columns are converted to Python scalars so they serialize
+        names = list(columns)
+        rows = zip(*(values.tolist() if isinstance(values, np.ndarray) else values
+                     for values in columns.values()))
+        
+        added = 0
+        for user_id, row in zip(user_ids, rows):
+            added += self._insert_user(int(user_id), dict(zip(names, row)))
+        
+        if added:
+            self._mark_dirty()
+        return added
+    
+    def _insert_user(self, user_id: int, user_data: Dict[str, Any]) -> bool:
+        """Store a new user record without marking the database dirty"""
+        if user_id in self.users:
+            logger.warning("User %s already exists", user_id)
             return False
         
-        self.users[str(user_id)] = user_data
+        self.users[user_id] = user_data
+        if self._username_index is not None and 'username' in user_data:
+            self._username_index.setdefault(user_data['username'], user_id)
         
         # Initialize biometric data if provided
         if 'face_data' in user_data:
-            self.stored_face[str(user_id)] = user_data['face_data']
+            self.stored_face[user_id] = user_data['face_data']
         
         if 'typing_pattern' in user_data:
-            self.stored_typing_pattern[str(user_id)] = user_data['typing_pattern']
+            self.stored_typing_pattern[user_id] = user_data['typing_pattern']
         
         # Initialize empty lists for devices and logins
-        self.trusted_devices[str(user_id)] = []
-        self.historical_logins[str(user_id)] = []
-        
-        self._save_data()
+        self.trusted_devices[user_id] = set()
+        self._device_indexes.pop(user_id, None)
+        self.historical_logins[user_id] = []
         return True
     
-    def get_user_detail(self, user_id: int) -> Optional[Dict[str, Any]]:
+    def get_user_detail(self, user_id: int) -> Optional[ChainMap[str, Any]]:
         """
         Get user details from the database
         
+        The result is a view layering the biometric data, trusted devices and
+        login history over the stored user record; only the trusted devices
+        are copied. The devices and history are read-only, and each call
+        returns a new view whose writes stay in that view; use update_user
+        to change the stored record.
+        
         Args:
             user_id: Unique identifier for the user
             
         Returns:
-            Optional[Dict[str, Any]]: User data if found, None otherwise
+            Optional[ChainMap[str, Any]]: User data if found, None otherwise
         """
-        user_id_str = str(user_id)
-        if user_id_str not in self.users:
-            print(f"User {user_id} not found")
+        if user_id not in self.users:
+            logger.warning("User %s not found", user_id)
             return None
         
-        # Combine all user data
-        user_data = self.users[user_id_str].copy()
+        # The data kept outside the user record is collected once per version
+        cached = self._detail_cache.get(user_id)
+        if cached is not None and cached[0] == self._version:
+            return collections.ChainMap({}, cached[1], self.users[user_id])
+        
+        extra = {}
         
         # Add biometric data
-        if user_id_str in self.stored_face:
-            user_data['stored_face'] = self.stored_face[user_id_str]
+        if user_id in self.stored_face:
+            extra['stored_face'] = self.stored_face[user_id]
         
-        if user_id_str in self.stored_typing_pattern:
-            user_data['stored_typing_pattern'] = self.stored_typing_pattern[user_id_str]
+        if user_id in self.stored_typing_pattern:
+            extra['stored_typing_pattern'] = self.stored_typing_pattern[user_id]
         
-        # Add trusted devices and login history
-        if user_id_str in self.trusted_devices:
-            user_data['trusted_devices'] = self.trusted_devices[user_id_str]
+        # Add trusted devices and login history; both are read-only, so they
+        # can only change through the methods that keep the indexes in step
+        if user_id in self.trusted_devices:
+            extra['trusted_devices'] = frozenset(self.trusted_devices[user_id])
         
-        if user_id_str in self.historical_logins:
-            user_data['historical_logins'] = self.historical_logins[user_id_str]
+        if user_id in self.historical_logins:
+            extra['historical_logins'] = _LoginHistoryView(self.historical_logins[user_id])
         
-        return user_data
+        # Writes to the view land in its own first layer, never in the shared
+        # extra layer or the stored record
+        extra = MappingProxyType(extra)
+        self._detail_cache[user_id] = (self._version, extra)
+        return collections.ChainMap({}, extra, self.users[user_id])
+    
+    def get_user_id_by_username(self, username: str) -> Optional[int]:
+        """
+        Look up a user ID by username
+        
+        Args:
+            username: Username to look up
+            
+        Returns:
+            Optional[int]: User ID if a user has the username, None otherwise
+        """
+        if self._username_index is None:
+            # The first user added with a username keeps it
+            index = {}
+            for user_id, user_data in self.users.items():
+                if 'username' in user_data:
+                    index.setdefault(user_data['username'], user_id)
+            self._username_index = index
+        return self._username_index.get(username)
     
     def update_user(self, user_id: int, user_data: Dict[str, Any]) -> bool:
         """
@@ -174,28 +625,33 @@ class UserDatabase:
         Returns:
             bool: True if user was updated successfully, False otherwise
         """
-        user_id_str = str(user_id)
-        if user_id_str not in self.users:
-            print(f"User {user_id} not found")
+        if user_id not in self.users:
+            logger.warning("User %s not found", user_id)
             return False
         
         # Update user data
-        self.users[user_id_str].update(user_data)
+        self.users[user_id].update(user_data)
+        if 'username' in user_data:
+            self._username_index = None
         
         # Update biometric data if provided
         if 'face_data' in user_data:
-            self.stored_face[user_id_str] = user_data['face_data']
+            self.stored_face[user_id] = user_data['face_data']
         
         if 'typing_pattern' in user_data:
-            self.stored_typing_pattern[user_id_str] = user_data['typing_pattern']
+            self.stored_typing_pattern[user_id] = user_data['typing_pattern']
         
-        self._save_data()
+        self._mark_dirty()
         return True
     
     def add_login_record(self, user_id: int, login_data: Dict[str, Any]) -> bool:
         """
         Add a login record to the user's history
         
+        The timestamp may be a datetime or an ISO 8601 string; it is stored as
+        a datetime, written to the login file in ISO format by the serializer
+        and parsed back into a datetime on reload.
+        
         Args:
             user_id: Unique identifier for the user
             login_data: Dictionary containing login data
@@ -203,24 +659,49 @@ class UserDatabase:
         Returns:
             bool: True if record was added successfully, False otherwise
         """
-        user_id_str = str(user_id)
-        if user_id_str not in self.users:
-            print(f"User {user_id} not found")
+        if user_id not in self.users:
+            logger.warning("User %s not found", user_id)
             return False
         
-        # Ensure login_data has a timestamp
-        if 'timestamp' not in login_data:
-            login_data['timestamp'] = datetime.now().isoformat()
-        
-        # Add login record
-        if user_id_str not in self.historical_logins:
-            self.historical_logins[user_id_str] = []
+        if not self._valid_location(user_id, login_data):
+            return False
         
-        self.historical_logins[user_id_str].append(login_data)
+        # Store a copy, so the caller's dict is never changed, and ensure it
+        # has a timestamp
+        login_data = dict(login_data)
+        login_data.setdefault('timestamp', datetime.now())
         
-        self._save_data()
+        # Append the record to the login file; the data file is left untouched
+        self._append_logins([(user_id, login_data)])
         return True
     
+    def add_login_records(self, records: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+        """
+        Add several login records with a single append to the login file
+        
+        Args:
+            records: (user_id, login_data) pairs; records of unknown users or
+                     with an invalid location are skipped
+            
+        Returns:
+            int: Number of records added
+        """
+        now = datetime.now()
+        batch = []
+        for user_id, login_data in records:
+            if user_id not in self.users:
+                logger.warning("User %s not found", user_id)
+                continue
+            if not self._valid_location(user_id, login_data):
+                continue
+            login_data = dict(login_data)
+            login_data.setdefault('timestamp', now)
+            batch.append((user_id, login_data))
+        
+        if batch:
+            self._append_logins(batch)
+        return len(batch)
+    
     def add_trusted_device(self, user_id: int, device_info: str) -> bool:
         """
         Add a trusted device for the user
@@ -232,22 +713,70 @@ class UserDatabase:
         Returns:
             bool: True if device was added successfully, False otherwise
         """
-        user_id_str = str(user_id)
-        if user_id_str not in self.users:
-            print(f"User {user_id} not found")
+        if user_id not in self.users:
+            logger.warning("User %s not found", user_id)
             return False
         
         # Initialize trusted devices list if it doesn't exist
-        if user_id_str not in self.trusted_devices:
-            self.trusted_devices[user_id_str] = []
+        if user_id not in self.trusted_devices:
+            self.trusted_devices[user_id] = set()
         
         # Add device if not already trusted
-        if device_info not in self.trusted_devices[user_id_str]:
-            self.trusted_devices[user_id_str].append(device_info)
-            self._save_data()
+        if device_info not in self.trusted_devices[user_id]:
+            self.trusted_devices[user_id].add(device_info)
+            self._device_indexes.pop(user_id, None)
+            self._mark_dirty()
         
         return True
     
+    def is_trusted_device(self, user_id: int, device_info: str) -> bool:
+        """
+        Check whether a device is one of the user's trusted devices
+        
+        Args:
+            user_id: Unique identifier for the user
+            device_info: Information about the device
+            
+        Returns:
+            bool: True if the device is trusted, False otherwise
+        """
+        return device_info in self.trusted_devices.get(user_id, ())
+    
+    def get_trusted_device_index(self, user_id: int) -> TrustedDeviceIndex:
+        """
+        Get the compiled matcher over a user's trusted devices
+        
+        The index is built on first use and kept until the user's trusted
+        devices change, so repeated logins do not rebuild it.
+        
+        Args:
+            user_id: Unique identifier for the user
+            
+        Returns:
+            TrustedDeviceIndex: Index over the user's trusted devices
+        """
+        index = self._device_indexes.get(user_id)
+        if index is None:
+            index = self._device_indexes[user_id] = TrustedDeviceIndex(self.trusted_devices.get(user_id, ()))
+        return index
+    
+    def match_device(self, user_id: int, device_info: str) -> bool:
+        """
+        Check a device against the user's trusted devices, allowing partial matches
+        
+        Args:
+            user_id: Unique identifier for the user
+            device_info: Information about the device, or part of it
+            
+        Returns:
+            bool: True if a trusted device equals or contains the device information
+        """
+        devices = self.trusted_devices.get(user_id)
+        if not devices:
+            return False
+        # Exact matches are a hash lookup; partial matches scan the compiled index
+        return device_info in devices or device_info in self.get_trusted_device_index(user_id)
+    
     def compare_with_current(self, user_id: int, current_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Compare current login data with historical patterns
@@ -259,55 +788,237 @@ class UserDatabase:
         Returns:
             Dict[str, Any]: Comparison results
         """
-        user_id_str = str(user_id)
-        if user_id_str not in self.users:
-            print(f"User {user_id} not found")
+        if user_id not in self.users:
+            logger.warning("User %s not found", user_id)
             return {"error": "User not found", "anomalies": []}
         
         anomalies = []
         
         # Check if device is trusted
         if 'device_info' in current_data:
-            device_trusted = False
-            if user_id_str in self.trusted_devices:
-                device_trusted = any(current_data['device_info'] in device 
-                                    for device in self.trusted_devices[user_id_str])
-            
-            if not device_trusted:
+            if not self.match_device(user_id, current_data['device_info']):
                 anomalies.append("Untrusted device")
         
         # Check if location matches historical patterns
-        if 'location' in current_data and user_id_str in self.historical_logins:
-            location_matches = False
-            for login in self.historical_logins[user_id_str]:
-                if 'location' in login and login['location'] == current_data['location']:
-                    location_matches = True
-                    break
+        if 'location' in current_data and user_id in self.historical_logins:
+            # Translate the location once, then compare integer IDs
+            location_id = self._lookup_location(user_id, current_data)
+            location_matches = location_id in self._login_locations.get(user_id, ())
             
-            if not location_matches and len(self.historical_logins[user_id_str]) > 0:
+            if not location_matches and len(self.historical_logins[user_id]) > 0:
                 anomalies.append("Unusual location")
         
         # Check login time pattern
-        if user_id_str in self.historical_logins and len(self.historical_logins[user_id_str]) > 0:
+        if user_id in self.historical_logins and len(self.historical_logins[user_id]) > 0:
             current_time = datetime.now()
             current_hour = current_time.hour
             
-            # Count logins by hour
-            hour_counts = {}
-            for login in self.historical_logins[user_id_str]:
-                if 'timestamp' in login:
-                    try:
-                        login_time = datetime.fromisoformat(login['timestamp'])
-                        hour = login_time.hour
-                        hour_counts[hour] = hour_counts.get(hour, 0) + 1
-                    except (ValueError, TypeError):
-                        pass
+            # Check if current hour is common, using the per-hour login counts
+            hour_counts = self._hour_counts.get(user_id)
+            if hour_counts and 0 < hour_counts[current_hour] < 2:  # Only 1 login at this hour
+                anomalies.append("Unusual login time")
+        
+        return self._comparison_result(user_id, anomalies)
+    
+    def compare_with_current_batch(self, user_id: int,
+                                   current_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Compare several candidate logins with one user's historical patterns
+        
+        Applies the same checks as compare_with_current, with the location
+        check done as one vectorized membership test over the login columns.
+        
+        Args:
+            user_id: Unique identifier for the user
+            current_data_list: Dictionaries containing login data to compare
             
-            # Check if current hour is common
-            if hour_counts and current_hour in hour_counts:
-                if hour_counts[current_hour] < 2:  # Less than 2 logins at this hour
-                    anomalies.append("Unusual login time")
+        Returns:
+            List[Dict[str, Any]]: Comparison results, one per login
+        """
+        if user_id not in self.users:
+            logger.warning("User %s not found", user_id)
+            return [{"error": "User not found", "anomalies": []} for _ in current_data_list]
+        
+        columns = self._login_columns.get(user_id)
+        has_history = len(self.historical_logins.get(user_id, ())) > 0
+        
+        # Locations never seen before get -2, which matches no stored ID
+        has_location = np.fromiter(
+            ('location' in current_data for current_data in current_data_list),
+            dtype=bool, count=len(current_data_list)
+        )
+        query_ids = np.fromiter(
+            (self._lookup_location(user_id, current_data) for current_data in current_data_list),
+            dtype=np.int32, count=len(current_data_list)
+        )
+        if has_history and columns is not None:
+            unusual_location = has_location & ~np.isin(query_ids, columns.location_ids)
+        else:
+            unusual_location = np.zeros(len(current_data_list), dtype=bool)
+        
+        # The time check depends only on the current hour, so it is shared
+        unusual_time = False
+        if has_history:
+            hour_counts = self._hour_counts.get(user_id)
+            unusual_time = bool(hour_counts) and 0 < hour_counts[datetime.now().hour] < 2
+        
+        results = []
+        for current_data, location_flag in zip(current_data_list, unusual_location):
+            anomalies = []
+            if 'device_info' in current_data and not self.match_device(user_id, current_data['device_info']):
+                anomalies.append("Untrusted device")
+            if location_flag:
+                anomalies.append("Unusual location")
+            if unusual_time:
+                anomalies.append("Unusual login time")
+            results.append(self._comparison_result(user_id, anomalies))
         
+        return results
+    
+    def count_logins(self, user_id: int, hour: Optional[int] = None,
+                     location: Optional[str] = None) -> int:
+        """
+        Count a user's logins matching an hour and/or location
+        
+        Args:
+            user_id: Unique identifier for the user
+            hour: Hour of day to match (optional)
+            location: Location to match (optional)
+            
+        Returns:
+            int: Number of matching logins
+        """
+        columns = self._login_columns.get(user_id)
+        if columns is None:
+            return 0
+        
+        mask = np.ones(columns.size, dtype=bool)
+        if hour is not None:
+            mask &= columns.hours == hour
+        if location is not None:
+            mask &= columns.location_ids == self._lookup_location(user_id, {'location': location})
+        return int(np.count_nonzero(mask))
+    
+    def get_login_coordinates(self, user_id: int) -> np.ndarray:
+        """
+        Get the coordinates of the distinct locations a user has logged in from
+        
+        The array is rebuilt only when the user logs in from a new location,
+        so repeated logins from known places share one read-only array.
+        
+        Args:
+            user_id: Unique identifier for the user
+            
+        Returns:
+            np.ndarray: float32 array of shape (M, 2) in degrees, without unparseable locations
+        """
+        location_ids = self._login_locations.get(user_id)
+        if not location_ids:
+            return np.empty((0, 2), dtype=np.float32)
+        
+        cached = self._coordinate_cache.get(user_id)
+        if cached is not None and cached[0] == len(location_ids):
+            return cached[1]
+        
+        coordinates = np.array([self._location_coordinates[i] for i in location_ids], dtype=np.float32)
+        coordinates = coordinates[~np.isnan(coordinates).any(axis=1)]
+        coordinates.flags.writeable = False
+        self._coordinate_cache[user_id] = (len(location_ids), coordinates)
+        return coordinates
+    
+    def get_login_hour_histogram(self, user_id: int) -> np.ndarray:
+        """
+        Get the number of logins per hour of day for a user
+        
+        Args:
+            user_id: Unique identifier for the user
+            
+        Returns:
+            np.ndarray: Array of 24 login counts, indexed by hour
+        """
+        columns = self._login_columns.get(user_id)
+        if columns is None:
+            return np.zeros(24, dtype=np.int64)
+        hours = columns.hours
+        return np.bincount(hours[hours >= 0], minlength=24)
+    
+    def users_frame(self) -> "pd.DataFrame":
+        """
+        Build a columnar view of the stored users for bulk analytics
+        
+        Binary credential fields are left out. Biometric and device data are
+        summarized as flag and count columns.
+        
+        Returns:
+            pd.DataFrame: One row per user, indexed by integer user ID
+        """
+        import pandas as pd
+        
+        user_ids = list(self.users)
+        frame = pd.DataFrame.from_records(
+            [{key: value for key, value in self.users[user_id].items()
+              if key not in self.BINARY_FIELDS}
+             for user_id in user_ids],
+            index=pd.Index(np.array(user_ids, dtype=np.int64), name="user_id")
+        )
+        frame["has_face"] = [user_id in self.stored_face for user_id in user_ids]
+        frame["has_typing_pattern"] = [user_id in self.stored_typing_pattern for user_id in user_ids]
+        frame["trusted_device_count"] = np.fromiter(
+            (len(self.trusted_devices.get(user_id, ())) for user_id in user_ids),
+            dtype=np.int64, count=len(user_ids)
+        )
+        return frame
+    
+    def logins_frame(self) -> "pd.DataFrame":
+        """
+        Build a columnar view of every user's login history
+        
+        The frame is assembled from the per-user login columns, so no login
+        record dictionaries are visited. Locations are categorical over the
+        interned location names.
+        
+        Returns:
+            pd.DataFrame: One row per login with user_id, hour and location columns;
+                          hour is -1 and location is missing where unknown
+        """
+        import pandas as pd
+        
+        items = [(user_id, columns) for user_id, columns in self._login_columns.items() if columns.size]
+        if not items:
+            return pd.DataFrame({
+                "user_id": np.empty(0, dtype=np.int64),
+                "hour": np.empty(0, dtype=np.int8),
+                "location": pd.Categorical.from_codes(np.empty(0, dtype=np.int32), self._location_names)
+            })
+        
+        return pd.DataFrame({
+            "user_id": np.repeat(np.array([user_id for user_id, _ in items], dtype=np.int64),
+                                 [columns.size for _, columns in items]),
+            "hour": np.concatenate([columns.hours for _, columns in items]),
+            # Location IDs index _location_names and -1 marks a missing location,
+            # which are exactly the codes a Categorical expects
+            "location": pd.Categorical.from_codes(
+                np.concatenate([columns.location_ids for _, columns in items]),
+                self._location_names
+            )
+        })
+    
+    def typical_login_hours(self) -> "pd.Series":
+        """
+        Find each user's most common login hour
+        
+        Returns:
+            pd.Series: Most common hour per user with login history, indexed by user ID;
+                       ties resolve to the earliest hour
+        """
+        logins = self.logins_frame()
+        logins = logins[logins["hour"] >= 0]
+        counts = logins.groupby(["user_id", "hour"]).size()
+        return counts.groupby(level="user_id").idxmax().map(lambda key: key[1]).rename("hour")
+    
+    @staticmethod
+    def _comparison_result(user_id: int, anomalies: List[str]) -> Dict[str, Any]:
+        """Build the result dictionary of a login comparison"""
         return {
             "user_id": user_id,
             "anomalies": anomalies,
@@ -1,12 +1,57 @@
 """
 AuthenticationSystem class for the banking system
 """
+import logging
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Union
+
+import numpy as np
+
+from app.interfaces.login_interface import LoginInput
 
 # In a real implementation, we would import the Customer class
 # from app.models.customer import Customer
 
+logger = logging.getLogger(__name__)
+
+# Risk factors checked by evaluate_risk as (bit, description, risk weight)
+_RISK_FACTORS = (
+    (1, "Missing facial biometric data", 0.3),
+    (2, "Missing typing pattern data", 0.2),
+    (4, "Unusual login time", 0.2)
+)
+
+# Capped risk level and factor descriptions for every combination of factor bits
+_RISK_TABLE = tuple(
+    (
+        min(sum((weight for bit, _, weight in _RISK_FACTORS if mask & bit), 0.0), 1.0),
+        tuple(description for bit, description, _ in _RISK_FACTORS if mask & bit)
+    )
+    for mask in range(1 << len(_RISK_FACTORS))
+)
+
+# Risk levels of _RISK_TABLE as an array, indexed by a vector of masks
+_RISK_LEVELS = np.array([risk_level for risk_level, _ in _RISK_TABLE])
+
+# Hours of day counted as unusual, one bit per hour: 2 AM to 5 AM
+_UNUSUAL_HOUR_MASK = 0b0000_0000_0000_0000_0011_1100
+
+
+def _risk_mask(has_face: bool, has_typing: bool, hour: int) -> int:
+    """
+    Compute the bitmask of risk factors that apply to a login attempt
+    
+    Args:
+        has_face: Whether facial biometric data was provided
+        has_typing: Whether typing pattern data was provided
+        hour: Hour of the login attempt
+        
+    Returns:
+        int: Bitmask of the applicable _RISK_FACTORS
+    """
+    return (not has_face) | (not has_typing) << 1 | ((_UNUSUAL_HOUR_MASK >> hour) & 1) << 2
+
 
 class AuthenticationSystem:
     """
@@ -18,37 +63,48 @@ class AuthenticationSystem:
         login_location (str): Geographic location of the login attempt
     """
     
+    __slots__ = ("login_time", "login_device", "login_location", "risk_factors", "authentication_history")
+    
+    # Number of most recent authentication attempts kept in memory
+    HISTORY_LIMIT = 10_000
+    
     def __init__(self):
         """Initialize a new AuthenticationSystem instance"""
         self.login_time = datetime.now()
         self.login_device = ""
         self.login_location = ""
         self.risk_factors = []
-        self.authentication_history = []
+        self.authentication_history = deque(maxlen=self.HISTORY_LIMIT)
     
-    def authenticate(self, user_data: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+    def authenticate(self, user_data: Union[Dict[str, Any], LoginInput]) -> Tuple[bool, Dict[str, Any]]:
         """
         Authenticate a user based on provided credentials and biometric data
         
         Args:
-            user_data: Dictionary containing user credentials and biometric data
+            user_data: Dictionary or LoginInput containing user credentials and biometric data
             
         Returns:
             Tuple[bool, Dict[str, Any]]: Tuple containing authentication result (True/False)
                                         and additional information
         """
-        # Extract and store login metadata
-        self.login_device = user_data.get("device_info", "Unknown device")
-        self.login_location = user_data.get("location", "Unknown location")
+        # Extract and store login metadata; one instance serves many attempts,
+        # so the login time is taken per attempt
+        self.login_time = datetime.now()
+        if isinstance(user_data, LoginInput):
+            self.login_device = user_data.device_info or "Unknown device"
+            self.login_location = user_data.location or "Unknown location"
+        else:
+            self.login_device = user_data.get("device_info", "Unknown device")
+            self.login_location = user_data.get("location", "Unknown location")
         
         # In a real implementation, this would:
         # 1. Verify username and password against database
         # 2. Check biometric data if available
         # 3. Analyze additional risk factors
         
-        print(f"Authenticating user at {self.login_time}")
-        print(f"Device: {self.login_device}")
-        print(f"Location: {self.login_location}")
+        logger.debug("Authenticating user at %s", self.login_time)
+        logger.debug("Device: %s", self.login_device)
+        logger.debug("Location: %s", self.login_location)
         
         # Evaluate risk factors
         risk_level = self.evaluate_risk(user_data)
@@ -72,19 +128,53 @@ class AuthenticationSystem:
             "additional_verification_required": 0.3 <= risk_level < 0.7
         })
     
-    def evaluate_risk(self, user_data: Dict[str, Any]) -> float:
+    def authenticate_batch(self, logins: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Authenticate a batch of login attempts made at the same time
+        
+        Applies the same risk rules as authenticate, building the factor
+        bitmasks for the whole batch with array operations.
+        
+        Args:
+            logins: Dictionaries containing user credentials and biometric data
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Authentication results and risk levels
+        """
+        self.login_time = datetime.now()
+        count = len(logins)
+        
+        has_face = np.fromiter((bool(login.get("face_data")) for login in logins), dtype=bool, count=count)
+        has_typing = np.fromiter((bool(login.get("typing_pattern")) for login in logins), dtype=bool, count=count)
+        unusual_hour = (_UNUSUAL_HOUR_MASK >> self.login_time.hour) & 1
+        masks = (~has_face).astype(np.intp) | (~has_typing).astype(np.intp) << 1 | unusual_hour << 2
+        
+        risk_levels = _RISK_LEVELS[masks]
+        results = risk_levels < 0.7
+        
+        # Record the authentication attempts
+        self.authentication_history.extend(
+            {
+                "timestamp": self.login_time,
+                "device": login.get("device_info", "Unknown device"),
+                "location": login.get("location", "Unknown location"),
+                "risk_level": float(risk_level),
+                "success": bool(result)
+            }
+            for login, risk_level, result in zip(logins, risk_levels, results)
+        )
+        return (results, risk_levels)
+    
+    def evaluate_risk(self, user_data: Union[Dict[str, Any], LoginInput]) -> float:
         """
         Evaluate the risk level of the authentication attempt
         
         Args:
-            user_data: Dictionary containing user credentials and biometric data
+            user_data: Dictionary or LoginInput containing user credentials and biometric data
             
         Returns:
             float: Risk level between 0.0 (no risk) and 1.0 (highest risk)
         """
-        self.risk_factors = []
-        risk_level = 0.0
-        
         # In a real implementation, this would use AI models to evaluate:
         # 1. Unusual login location
         # 2. Unusual login time
@@ -93,23 +183,17 @@ class AuthenticationSystem:
         # 5. Typing pattern anomalies
         # 6. Network characteristics
         
-        # Simulate some risk evaluation logic
-        if "face_data" not in user_data or not user_data["face_data"]:
-            self.risk_factors.append("Missing facial biometric data")
-            risk_level += 0.3
-        
-        if "typing_pattern" not in user_data or not user_data["typing_pattern"]:
-            self.risk_factors.append("Missing typing pattern data")
-            risk_level += 0.2
-        
-        # Check if login time is during unusual hours (2 AM - 5 AM)
-        hour = self.login_time.hour
-        if 2 <= hour <= 5:
-            self.risk_factors.append("Unusual login time")
-            risk_level += 0.2
+        # Simulate some risk evaluation logic: the applicable factors form a
+        # bitmask that indexes the precomputed risk levels
+        if isinstance(user_data, LoginInput):
+            face_data, typing_pattern = user_data.face_data, user_data.typing_pattern
+        else:
+            face_data, typing_pattern = user_data.get("face_data"), user_data.get("typing_pattern")
+        mask = _risk_mask(bool(face_data), bool(typing_pattern), self.login_time.hour)
+        risk_level, risk_factors = _RISK_TABLE[mask]
+        self.risk_factors = list(risk_factors)
         
-        # Cap risk level at 1.0
-        return min(risk_level, 1.0)
+        return risk_level
     
     def request_additional_verification(self, verification_type: str) -> Dict[str, Any]:
         """
@@ -121,7 +205,7 @@ class AuthenticationSystem:
         Returns:
             Dict[str, Any]: Information about the additional verification request
         """
-        print(f"Requesting additional verification: {verification_type}")
+        logger.info("Requesting additional verification: %s", verification_type)
         
         return {
             "verification_type": verification_type,
@@ -2,9 +2,28 @@
 ProactiveDefenseSystem class for the banking system
 """
 from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
 from datetime import datetime
+import hashlib
+import logging
 import random  # For simulation purposes only
 
+logger = logging.getLogger(__name__)
+
+
+def _sample_fraction(*key: Any) -> float:
+    """
+    Map a key to a deterministic pseudo-random fraction in [0, 1)
+    
+    Args:
+        key: Values identifying the sampled item
+        
+    Returns:
+        float: Fraction derived from a hash of the key, stable across runs
+    """
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") / 2 ** 64
+
 
 class ProactiveDefenseSystem:
     """
@@ -15,19 +34,29 @@ class ProactiveDefenseSystem:
         response_plan (str): Current response plan
     """
     
+    __slots__ = ("threat_level", "response_plan", "active_threats", "blocked_ips",
+                 "security_alerts", "last_scan_time")
+    
     # Threat level constants
     THREAT_LEVEL_LOW = 1
     THREAT_LEVEL_MEDIUM = 2
     THREAT_LEVEL_HIGH = 3
     THREAT_LEVEL_CRITICAL = 4
     
+    # Fraction of large transactions flagged as suspicious
+    LARGE_TRANSACTION_FLAG_RATE = 0.3
+    
+    # Number of most recent threats and alerts kept in memory; blocked IPs
+    # are not capped, so a block is never dropped silently
+    HISTORY_LIMIT = 10_000
+    
     def __init__(self):
         """Initialize a new ProactiveDefenseSystem instance"""
         self.threat_level = self.THREAT_LEVEL_LOW
         self.response_plan = "Standard monitoring"
-        self.active_threats = []
-        self.blocked_ips = []
-        self.security_alerts = []
+        self.active_threats = deque(maxlen=self.HISTORY_LIMIT)
+        self.blocked_ips = set()
+        self.security_alerts = deque(maxlen=self.HISTORY_LIMIT)
         self.last_scan_time = datetime.now()
     
     def detect_threat(self, activity_data: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
@@ -41,7 +70,7 @@ class ProactiveDefenseSystem:
             Tuple[bool, Dict[str, Any]]: Tuple containing threat detection result (True if threat detected)
                                         and additional information
         """
-        print("Analyzing activity for potential threats")
+        logger.debug("Analyzing activity for potential threats")
         
         # In a real implementation, this would use advanced AI models to:
         # 1. Analyze network traffic patterns
@@ -69,7 +98,9 @@ class ProactiveDefenseSystem:
             transaction = activity_data['transaction']
             if transaction.get('amount', 0) > 10000:
                 # Large transactions aren't necessarily threats, but warrant closer inspection
-                if random.random() < 0.3:  # 30% chance of being flagged as suspicious
+                # The same transaction is always sampled the same way
+                sample = _sample_fraction(transaction.get('transaction_id'), transaction.get('amount'))
+                if sample < self.LARGE_TRANSACTION_FLAG_RATE:
                     threat_detected = True
                     threat_details['type'] = 'unusual_transaction'
                     threat_details['severity'] = 'medium'
@@ -133,12 +164,12 @@ class ProactiveDefenseSystem:
         Returns:
             bool: True if access was blocked successfully, False otherwise
         """
-        print(f"Blocking access: {access_data}")
+        logger.warning("Blocking access: %s", access_data)
         
         # Block IP address if provided
         if 'ip_address' in access_data and access_data['ip_address'] not in self.blocked_ips:
-            self.blocked_ips.append(access_data['ip_address'])
-            print(f"IP address {access_data['ip_address']} added to blocked list")
+            self.blocked_ips.add(access_data['ip_address'])
+            logger.info("IP address %s added to blocked list", access_data['ip_address'])
         
         # In a real implementation, this would:
         # 1. Update firewall rules
@@ -166,7 +197,7 @@ class ProactiveDefenseSystem:
         Returns:
             bool: True if alert was sent successfully, False otherwise
         """
-        print(f"Alerting security team: {alert_data.get('message', 'No message provided')}")
+        logger.warning("Alerting security team: %s", alert_data.get('message', 'No message provided'))
         
         # Ensure alert has a timestamp
         if 'timestamp' not in alert_data:
@@ -206,7 +237,7 @@ class ProactiveDefenseSystem:
         Returns:
             Dict[str, Any]: Results of the security scan
         """
-        print("Running comprehensive security scan")
+        logger.info("Running comprehensive security scan")
         self.last_scan_time = datetime.now()
         
         # In a real implementation, this would:
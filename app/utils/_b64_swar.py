@@ -0,0 +1,73 @@
+"""
+SWAR base64 encoder for the banking system
+
+Packs each 3-byte input group into one integer and extracts the four 6-bit
+alphabet indices with shifts and masks. Compiled with numba when it is
+installed; serialization only selects it in that case, since the
+interpreted loop is slower than the standard library.
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Standard base64 alphabet as byte values, indexed by 6-bit group
+_ALPHABET = np.frombuffer(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/", dtype=np.uint8
+)
+_PAD = ord("=")
+
+
+def _encode_into(data: np.ndarray, table: np.ndarray, out: np.ndarray) -> None:
+    """
+    Encode bytes into a preallocated output buffer
+    
+    Args:
+        data: Input bytes as a uint8 array
+        table: Base64 alphabet as a uint8 array
+        out: Output buffer of 4 * ceil(len(data) / 3) bytes
+    """
+    full = len(data) - len(data) % 3
+    j = 0
+    for i in range(0, full, 3):
+        word = (int(data[i]) << 16) | (int(data[i + 1]) << 8) | int(data[i + 2])
+        out[j] = table[(word >> 18) & 0x3F]
+        out[j + 1] = table[(word >> 12) & 0x3F]
+        out[j + 2] = table[(word >> 6) & 0x3F]
+        out[j + 3] = table[word & 0x3F]
+        j += 4
+    
+    # A one or two byte tail is zero-padded and completed with "="
+    remaining = len(data) - full
+    if remaining:
+        word = int(data[full]) << 16
+        if remaining == 2:
+            word |= int(data[full + 1]) << 8
+        out[j] = table[(word >> 18) & 0x3F]
+        out[j + 1] = table[(word >> 12) & 0x3F]
+        out[j + 2] = table[(word >> 6) & 0x3F] if remaining == 2 else _PAD
+        out[j + 3] = _PAD
+
+
+# Whether the encoder is compiled and worth using over the standard library
+AVAILABLE = numba is not None
+if AVAILABLE:
+    _encode_into = numba.njit(cache=True)(_encode_into)
+
+
+def b64encode(data: bytes) -> bytes:
+    """
+    Encode binary data as base64
+    
+    Args:
+        data: Binary data to encode
+        
+    Returns:
+        bytes: Base64 encoded data
+    """
+    source = np.frombuffer(data, dtype=np.uint8)
+    out = np.empty(4 * ((len(source) + 2) // 3), dtype=np.uint8)
+    _encode_into(source, _ALPHABET, out)
+    return out.tobytes()
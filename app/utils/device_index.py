@@ -0,0 +1,80 @@
+"""
+Trusted device matching utilities for the banking system
+"""
+import hashlib
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+
+
+def device_fingerprint(device_info: str) -> int:
+    """
+    Hash device information to a 64-bit fingerprint
+    
+    Args:
+        device_info: Device information string
+        
+    Returns:
+        int: Unsigned 64-bit fingerprint
+    """
+    digest = hashlib.blake2b(device_info.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class TrustedDeviceIndex:
+    """
+    Precompiled index over a user's trusted devices
+    
+    A device is trusted when its information is contained in one of the
+    trusted device strings, matching the check in AIEngine.verify_device.
+    Build the index once per user and reuse it across verifications.
+    
+    Partial matches are found with a single substring search over all
+    trusted devices joined by NUL separators, so the scan runs in C
+    instead of probing each device from Python.
+    
+    Attributes:
+        devices (Tuple[str, ...]): Trusted devices in insertion order
+        fingerprints (np.ndarray): 64-bit fingerprints of the trusted devices
+    """
+    
+    # Separator between devices in the search haystack
+    SEPARATOR = "\0"
+    
+    __slots__ = ("devices", "fingerprints", "_haystack")
+    
+    def __init__(self, trusted_devices: Iterable[str]):
+        """
+        Initialize a new TrustedDeviceIndex instance
+        
+        Args:
+            trusted_devices: Trusted device strings to index
+        """
+        self.devices: Tuple[str, ...] = tuple(trusted_devices)
+        self.fingerprints = np.fromiter(
+            (device_fingerprint(device) for device in self.devices),
+            dtype=np.uint64,
+            count=len(self.devices)
+        )
+        self._haystack = self.SEPARATOR.join(self.devices)
+    
+    def __contains__(self, device_info: str) -> bool:
+        """Check whether the device information matches a trusted device"""
+        # Exact matches are the common case; compare fingerprints in one
+        # vectorized scan instead of comparing strings
+        if (self.fingerprints == np.uint64(device_fingerprint(device_info))).any():
+            return True
+        # A needle without the separator cannot match across two devices
+        if self.SEPARATOR in device_info:
+            return any(device_info in trusted_device for trusted_device in self.devices)
+        return bool(self.devices) and device_info in self._haystack
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.devices)
+    
+    def __len__(self) -> int:
+        return len(self.devices)
+    
+    def __str__(self) -> str:
+        """String representation of the TrustedDeviceIndex"""
+        return f"TrustedDeviceIndex(devices={len(self.devices)})"
@@ -1,11 +1,56 @@
 """
 Encryption utilities for the banking system
 """
-import base64
+import binascii
 import hashlib
+import hmac
 import os
 import secrets
-from typing import Tuple, Optional
+import struct
+import time
+from typing import Dict, Tuple, Optional, Union
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.utils import serialization
+
+# PBKDF2 parameters used by hash_password
+PBKDF2_ITERATIONS = 100000
+PBKDF2_KEY_LENGTH = 32
+
+# Password checks are reused by verify_password for repeated attempts within
+# this many seconds; at most VERIFY_CACHE_SIZE results are kept
+VERIFY_CACHE_SECONDS = 60.0
+VERIFY_CACHE_SIZE = 128
+
+# AES-GCM nonce length in bytes
+GCM_NONCE_LENGTH = 12
+
+# Fixed-layout header of encrypted data: magic, nonce, ciphertext length
+_MAGIC = b'ENC1'
+_HEADER = struct.Struct(f'<4s{GCM_NONCE_LENGTH}sI')
+
+# Base64 characters decoded per step by decode_biometric_data_into; a multiple of 4
+DECODE_CHUNK_CHARS = 64 * 1024
+
+# Without OpenSSL, hashlib.pbkdf2_hmac on Python < 3.12 is a pure-Python loop;
+# the cryptography package always derives through OpenSSL
+if hashlib.pbkdf2_hmac.__module__ == '_hashlib':
+    _PBKDF2HMAC = None
+else:
+    try:
+        from cryptography.hazmat.primitives import hashes as _hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC as _PBKDF2HMAC
+    except ImportError:
+        _PBKDF2HMAC = None
+
+# Maps a keyed digest of (stored hash, salt, password) to (expiry time,
+# whether the password matched). Only the result is kept, never the derived
+# key, and the digest uses a per-process secret, so no cached value can be
+# checked against password guesses offline
+_verify_cache: Dict[bytes, Tuple[float, bool]] = {}
+_VERIFY_CACHE_SECRET = os.urandom(32)
 
 
 def generate_salt(length: int = 16) -> bytes:
@@ -21,12 +66,23 @@ def generate_salt(length: int = 16) -> bytes:
     return os.urandom(length)
 
 
-def hash_password(password: str, salt: Optional[bytes] = None) -> Tuple[bytes, bytes]:
+def _password_bytes(password: Union[str, bytes]) -> bytes:
+    """Encode a password as UTF-8, taking the cheaper ASCII path when it applies"""
+    if isinstance(password, bytes):
+        return password
+    try:
+        # ASCII text encodes to the same bytes as UTF-8
+        return password.encode('ascii')
+    except UnicodeEncodeError:
+        return password.encode('utf-8')
+
+
+def hash_password(password: Union[str, bytes], salt: Optional[bytes] = None) -> Tuple[bytes, bytes]:
     """
     Hash a password with a salt using PBKDF2
     
     Args:
-        password: Password to hash
+        password: Password to hash, as text or UTF-8 encoded bytes
         salt: Salt to use (if None, a new salt will be generated)
         
     Returns:
@@ -35,44 +91,72 @@ def hash_password(password: str, salt: Optional[bytes] = None) -> Tuple[bytes, b
     if salt is None:
         salt = generate_salt()
     
-    # Use PBKDF2 with SHA-256, 100,000 iterations
-    key = hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode('utf-8'),
-        salt,
-        100000
-    )
+    return _pbkdf2(_password_bytes(password), salt), salt
+
+
+def _pbkdf2(password: bytes, salt: bytes, length: int = PBKDF2_KEY_LENGTH) -> bytes:
+    """Derive a key of the given length with PBKDF2-HMAC-SHA256 through OpenSSL where possible"""
+    if _PBKDF2HMAC is not None:
+        return _PBKDF2HMAC(
+            algorithm=_hashes.SHA256(),
+            length=length,
+            salt=salt,
+            iterations=PBKDF2_ITERATIONS
+        ).derive(password)
     
-    return key, salt
+    # Use PBKDF2 with SHA-256, 100,000 iterations
+    return hashlib.pbkdf2_hmac('sha256', password, salt, PBKDF2_ITERATIONS, dklen=length)
 
 
-def verify_password(password: str, stored_hash: bytes, salt: bytes) -> bool:
+def verify_password(password: Union[str, bytes], stored_hash: bytes, salt: bytes) -> bool:
     """
     Verify a password against a stored hash
     
+    The result is cached briefly, so retries of the same password within
+    VERIFY_CACHE_SECONDS skip the PBKDF2 iterations.
+    
     Args:
-        password: Password to verify
+        password: Password to verify, as text or UTF-8 encoded bytes
         stored_hash: Stored hash to compare against
         salt: Salt used for hashing
         
     Returns:
         bool: True if password matches, False otherwise
     """
-    key, _ = hash_password(password, salt)
-    return secrets.compare_digest(key, stored_hash)
+    password_bytes = _password_bytes(password)
+    
+    # Lengths are included so distinct (hash, salt, password) splits never share a key
+    cache_input = b'%d:%d:%b%b%b' % (len(stored_hash), len(salt), stored_hash, salt, password_bytes)
+    cache_key = hmac.new(_VERIFY_CACHE_SECRET, cache_input, hashlib.sha256).digest()
+    now = time.monotonic()
+    
+    cached = _verify_cache.get(cache_key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    
+    # Derive exactly as many bytes as the stored hash holds
+    key = _pbkdf2(password_bytes, salt, len(stored_hash))
+    result = secrets.compare_digest(key, stored_hash)
+    if len(_verify_cache) >= VERIFY_CACHE_SIZE:
+        # Evict the oldest entry; dicts keep insertion order
+        _verify_cache.pop(next(iter(_verify_cache)), None)
+    _verify_cache[cache_key] = (now + VERIFY_CACHE_SECONDS, result)
+    return result
 
 
 def encode_biometric_data(data: bytes) -> str:
     """
     Encode biometric data for storage
     
+    Uses the SIMD base64 codec from pybase64 when it is installed.
+    
     Args:
         data: Raw biometric data
         
     Returns:
         str: Encoded data as a string
     """
-    return base64.b64encode(data).decode('utf-8')
+    return serialization.b64encode(data)
 
 
 def decode_biometric_data(encoded_data: str) -> bytes:
@@ -85,7 +169,36 @@ def decode_biometric_data(encoded_data: str) -> bytes:
     Returns:
         bytes: Decoded raw biometric data
     """
-    return base64.b64decode(encoded_data)
+    return serialization.b64decode(encoded_data)
+
+
+def decode_biometric_data_into(encoded_data: Union[str, bytes], out: bytearray) -> int:
+    """
+    Decode stored biometric data into a caller-supplied buffer
+    
+    The data is decoded in chunks of DECODE_CHUNK_CHARS, so beyond the
+    buffer only one chunk's output is held at a time. Buffers can be reused
+    across calls.
+    
+    Args:
+        encoded_data: Encoded biometric data, without line breaks
+        out: Buffer of at least len(encoded_data) * 3 // 4 bytes
+        
+    Returns:
+        int: Number of bytes written to the start of out
+    """
+    if len(encoded_data) % 4:
+        raise ValueError("Encoded biometric data length must be a multiple of 4")
+    if len(out) < len(encoded_data) * 3 // 4:
+        raise ValueError(f"Output buffer needs at least {len(encoded_data) * 3 // 4} bytes")
+    
+    view = memoryview(out)
+    written = 0
+    for start in range(0, len(encoded_data), DECODE_CHUNK_CHARS):
+        chunk = serialization.b64decode(encoded_data[start:start + DECODE_CHUNK_CHARS])
+        view[written:written + len(chunk)] = chunk
+        written += len(chunk)
+    return written
 
 
 def generate_token(length: int = 32) -> str:
@@ -93,53 +206,76 @@ def generate_token(length: int = 32) -> str:
     Generate a secure random token
     
     Args:
-        length: Length of the token in bytes
+        length: Number of random bytes in the token
+        
+    Returns:
+        str: Secure random token as a URL-safe base64 string
+    """
+    return secrets.token_urlsafe(length)
+
+
+def generate_token_hex(length: int = 32) -> str:
+    """
+    Generate a secure random token in hexadecimal
+    
+    Args:
+        length: Number of random bytes in the token
         
     Returns:
         str: Secure random token as a hexadecimal string
     """
-    return secrets.token_hex(length)
+    return binascii.hexlify(os.urandom(length)).decode('ascii')
 
 
 def encrypt_sensitive_data(data: str, key: bytes) -> str:
     """
-    Encrypt sensitive data
+    Encrypt sensitive data with AES-256-GCM
     
-    Note: This is a placeholder. In a real implementation, this would use
-    a proper encryption library like cryptography.fernet
+    The cipher runs in OpenSSL, which uses the AES and carry-less multiply
+    instructions of the CPU where available.
     
     Args:
         data: Data to encrypt
-        key: Encryption key
+        key: Encryption key of any length, hashed to a 256-bit AES key
         
     Returns:
-        str: Encrypted data
+        str: Base64 encoded header followed by the ciphertext and tag
     """
-    # This is just a placeholder for demonstration
-    # In a real implementation, use a proper encryption library
-    return f"ENCRYPTED_{data}_WITH_KEY_{key.hex()[:8]}"
+    nonce = os.urandom(GCM_NONCE_LENGTH)
+    plaintext = data.encode('utf-8')
+    # The ciphertext is the plaintext plus a 16-byte tag
+    header = _HEADER.pack(_MAGIC, nonce, len(plaintext) + 16)
+    # The header is authenticated along with the data
+    ciphertext = _aes_gcm(key).encrypt(nonce, plaintext, header)
+    return serialization.b64encode(header + ciphertext)
 
 
 def decrypt_sensitive_data(encrypted_data: str, key: bytes) -> str:
     """
-    Decrypt sensitive data
-    
-    Note: This is a placeholder. In a real implementation, this would use
-    a proper decryption library like cryptography.fernet
+    Decrypt data produced by encrypt_sensitive_data
     
     Args:
         encrypted_data: Data to decrypt
         key: Decryption key
         
     Returns:
-        str: Decrypted data
+        str: Decrypted data, or "DECRYPTION_FAILED" if the data is malformed,
+             was tampered with or the key is wrong
     """
-    # This is just a placeholder for demonstration
-    # In a real implementation, use a proper encryption library
-    if encrypted_data.startswith("ENCRYPTED_") and "_WITH_KEY_" in encrypted_data:
-        # Extract the original data from our placeholder format
-        parts = encrypted_data.split("_WITH_KEY_")
-        data = parts[0].replace("ENCRYPTED_", "")
-        return data
-    
-    return "DECRYPTION_FAILED"
+    try:
+        raw = memoryview(serialization.b64decode(encrypted_data))
+        if raw[:len(_MAGIC)] != _MAGIC:
+            return "DECRYPTION_FAILED"
+        magic, nonce, length = _HEADER.unpack_from(raw)
+        ciphertext = raw[_HEADER.size:]
+        if len(ciphertext) != length:
+            return "DECRYPTION_FAILED"
+        # The header is authenticated along with the ciphertext
+        return _aes_gcm(key).decrypt(nonce, ciphertext, raw[:_HEADER.size]).decode('utf-8')
+    except (InvalidTag, ValueError, struct.error):
+        return "DECRYPTION_FAILED"
+
+
+def _aes_gcm(key: bytes) -> AESGCM:
+    """Create an AES-256-GCM cipher from a key of any length"""
+    return AESGCM(hashlib.sha256(key).digest())
@@ -0,0 +1,146 @@
+"""
+Geographic utilities for the banking system
+"""
+from typing import Iterable, Optional
+
+import numpy as np
+
+# Mean Earth radius in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+
+def parse_coordinates(locations: Iterable[str]) -> np.ndarray:
+    """
+    Parse "lat,lon" location strings into a coordinate array
+    
+    Args:
+        locations: Location strings in "lat,lon" degree format
+        
+    Returns:
+        np.ndarray: Array of shape (N, 2) in degrees, NaN for unparseable locations
+    """
+    locations = list(locations)
+    coordinates = np.full((len(locations), 2), np.nan)
+    for i, location in enumerate(locations):
+        try:
+            lat, lon = location.split(",")
+            coordinates[i] = (float(lat), float(lon))
+        except (AttributeError, ValueError):
+            continue
+    return coordinates
+
+
+def to_unit_vectors(coordinates: np.ndarray) -> np.ndarray:
+    """
+    Convert latitude/longitude pairs to points on the unit sphere
+    
+    Args:
+        coordinates: Array of shape (N, 2) in degrees
+        
+    Returns:
+        np.ndarray: Array of shape (N, 3) of unit vectors
+    """
+    lat, lon = np.radians(coordinates).T
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """
+    Convert straight-line distances between unit vectors to great-circle kilometres
+    
+    Args:
+        chord: Euclidean distances between points on the unit sphere
+        
+    Returns:
+        np.ndarray: Great-circle distances in kilometres
+    """
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2.0, 1.0))
+
+
+def haversine_km(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Compute great-circle distances between coordinate arrays
+    
+    Args:
+        a: Array of shape (..., 2) in degrees
+        b: Array of shape (..., 2) in degrees, broadcastable against a
+        
+    Returns:
+        np.ndarray: Great-circle distances in kilometres
+    """
+    lat1, lon1 = np.radians(a)[..., 0], np.radians(a)[..., 1]
+    lat2, lon2 = np.radians(b)[..., 0], np.radians(b)[..., 1]
+    h = (np.sin((lat2 - lat1) / 2.0) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2)
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+class LocationIndex:
+    """
+    Nearest-neighbour index over a user's historical login locations
+    
+    Locations are indexed as unit vectors, where straight-line distance is
+    monotonic in great-circle distance. A scipy KD-tree is used when scipy
+    is installed; otherwise queries fall back to a vectorized scan.
+    
+    Attributes:
+        coordinates (np.ndarray): Parseable historical coordinates, shape (N, 2)
+    """
+    
+    __slots__ = ("coordinates", "_points", "_tree")
+    
+    def __init__(self, locations: Iterable[str]):
+        """
+        Initialize a new LocationIndex instance
+        
+        Args:
+            locations: Historical locations in "lat,lon" format
+        """
+        coordinates = parse_coordinates(locations)
+        self.coordinates = coordinates[~np.isnan(coordinates).any(axis=1)]
+        self._points = to_unit_vectors(self.coordinates)
+        self._tree = self._build_tree(self._points)
+    
+    @staticmethod
+    def _build_tree(points: np.ndarray) -> Optional[object]:
+        """Build a KD-tree over the points if scipy is available"""
+        if len(points) == 0:
+            return None
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            return None
+        return cKDTree(points)
+    
+    def nearest_km(self, coordinates: np.ndarray) -> np.ndarray:
+        """
+        Find the distance from each query to its nearest historical location
+        
+        Args:
+            coordinates: Query coordinates of shape (M, 2) in degrees
+            
+        Returns:
+            np.ndarray: Distances in kilometres, inf for NaN queries or an empty index
+        """
+        coordinates = np.atleast_2d(coordinates)
+        distances = np.full(len(coordinates), np.inf)
+        valid = ~np.isnan(coordinates).any(axis=1)
+        if len(self._points) == 0 or not valid.any():
+            return distances
+        
+        queries = to_unit_vectors(coordinates[valid])
+        if self._tree is not None:
+            chord, _ = self._tree.query(queries, k=1, workers=-1)
+        else:
+            chord = np.sqrt(((queries[:, None, :] - self._points[None, :, :]) ** 2).sum(axis=2)).min(axis=1)
+        
+        distances[valid] = chord_to_km(chord)
+        return distances
+    
+    def __len__(self) -> int:
+        return len(self.coordinates)
+    
+    def __str__(self) -> str:
+        """String representation of the LocationIndex"""
+        return f"LocationIndex(locations={len(self.coordinates)})"
@@ -0,0 +1,189 @@
+"""
+JSON serialization helpers for the banking system
+"""
+import gzip
+import json
+from datetime import datetime
+from typing import Any, BinaryIO, Iterator, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# pybase64 provides SIMD-accelerated versions of the base64 functions; without
+# it, encoding uses the numba-compiled SWAR encoder when numba is installed
+try:
+    import pybase64 as _base64
+    _b64encode = _base64.b64encode
+except ImportError:
+    import base64 as _base64
+    from app.utils import _b64_swar
+    _b64encode = _b64_swar.b64encode if _b64_swar.AVAILABLE else _base64.b64encode
+
+# Leading bytes identifying compressed files, checked when reading
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Compression levels; zstd level 3 and gzip level 6 are the libraries' defaults
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+
+def b64encode(data: bytes) -> str:
+    """
+    Encode binary data as a base64 string
+    
+    Args:
+        data: Binary data to encode
+        
+    Returns:
+        str: Base64 encoded string
+    """
+    return _b64encode(data).decode("ascii")
+
+
+def b64decode(encoded_data: Union[str, bytes]) -> bytes:
+    """
+    Decode a base64 string to binary data
+    
+    Args:
+        encoded_data: Base64 encoded string
+        
+    Returns:
+        bytes: Decoded binary data
+    """
+    return _base64.b64decode(encoded_data)
+
+
+def encode_default(obj: Any) -> Any:
+    """
+    Convert values JSON has no type for
+    
+    Args:
+        obj: Value the serializer could not encode
+        
+    Returns:
+        Any: JSON-compatible replacement value
+    """
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return b64encode(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serialize an object to JSON bytes
+    
+    Uses orjson when it is installed and falls back to the standard library.
+    Bytes values are written as base64 strings.
+    
+    Args:
+        obj: Object to serialize
+        indent: Whether to indent the output by two spaces
+        sort_keys: Whether to write object keys in sorted order
+        
+    Returns:
+        bytes: UTF-8 encoded JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=encode_default, option=option)
+    
+    return json.dumps(obj, default=encode_default, indent=2 if indent else None,
+                      sort_keys=sort_keys).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Deserialize a JSON document
+    
+    Args:
+        data: JSON document as bytes or text
+        
+    Returns:
+        Any: Deserialized object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_items(f: BinaryIO) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterate over the top-level members of a JSON object stored in a file
+    
+    With ijson installed the file is parsed incrementally, so only one
+    member is materialized at a time and the raw document is never held
+    in memory. Otherwise the whole document is read and parsed at once.
+    
+    Args:
+        f: File opened in binary mode, containing a JSON object
+        
+    Returns:
+        Iterator[Tuple[str, Any]]: (key, value) pairs in document order
+    """
+    if ijson is not None:
+        return ijson.kvitems(f, "", use_float=True)
+    return iter(loads(f.read()).items())
+
+
+def compress(data: bytes) -> bytes:
+    """
+    Compress data for writing to disk
+    
+    Uses zstd when zstandard is installed and gzip otherwise. Either format
+    is recognized by open_decompressed.
+    
+    Args:
+        data: Data to compress
+        
+    Returns:
+        bytes: Compressed data
+    """
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    # A fixed mtime keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def open_decompressed(f: BinaryIO) -> BinaryIO:
+    """
+    Wrap a file so reads return its decompressed contents
+    
+    The format is detected from the leading bytes, so zstd, gzip and
+    uncompressed files can all be read.
+    
+    Args:
+        f: Seekable file opened in binary mode
+        
+    Returns:
+        BinaryIO: File-like object yielding the decompressed data
+    """
+    magic = f.read(len(ZSTD_MAGIC))
+    f.seek(0)
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise ValueError("File is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(f)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    return f
@@ -3,18 +3,61 @@ Command-line interface for the banking system
 """
 import argparse
 import getpass
+import logging
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from app.models.customer import Customer
-from app.interfaces.login_interface import LoginInterface
-from app.security.authentication_system import AuthenticationSystem
-from app.ai.ai_engine import AIEngine
-from app.models.user_database import UserDatabase
-from app.security.proactive_defense_system import ProactiveDefenseSystem
+import numpy as np
+
+from app.interfaces.login_interface import LoginInterface, new_session_id
 from app.models.transaction import Transaction
-from app.utils.encryption import hash_password, verify_password, generate_token
+from config.settings import get_config
+
+# The components are imported by their factories, so a command only loads
+# the modules it uses; "scan" never imports the AI engine or the database
+if TYPE_CHECKING:
+    from app.ai.ai_engine import AIEngine
+    from app.models.user_database import UserDatabase
+    from app.security.authentication_system import AuthenticationSystem
+    from app.security.proactive_defense_system import ProactiveDefenseSystem
+
+
+# Transfer amount risk rules: an amount above each threshold adds its weight
+_RISK_THRESHOLDS = np.array([5000.0, 10000.0, 50000.0])
+_RISK_WEIGHTS = np.array([0.3, 0.3, 0.4])
+_RISK_LABELS = (
+    "Large transaction amount",
+    "Very large transaction amount",
+    "Exceptionally large transaction amount"
+)
+
+
+# Components shared by every command in the process, created on first use
+@lru_cache(maxsize=1)
+def _user_db() -> "UserDatabase":
+    from app.models.user_database import UserDatabase
+    return UserDatabase()
+
+
+@lru_cache(maxsize=1)
+def _auth_system() -> "AuthenticationSystem":
+    from app.security.authentication_system import AuthenticationSystem
+    return AuthenticationSystem()
+
+
+@lru_cache(maxsize=1)
+def _ai_engine() -> "AIEngine":
+    from app.ai.ai_engine import AIEngine
+    return AIEngine()
+
+
+@lru_cache(maxsize=1)
+def _defense_system() -> "ProactiveDefenseSystem":
+    from app.security.proactive_defense_system import ProactiveDefenseSystem
+    return ProactiveDefenseSystem()
 
 
 def login(args):
@@ -26,24 +69,14 @@ def login(args):
     password = args.password or getpass.getpass("Password: ")
     
     # Create components
-    session_id = int(time.time())
-    login_interface = LoginInterface(session_id)
-    auth_system = AuthenticationSystem()
-    ai_engine = AIEngine()
-    user_db = UserDatabase()
+    login_interface = LoginInterface(new_session_id())
+    auth_system = _auth_system()
+    ai_engine = _ai_engine()
+    user_db = _user_db()
     
     # Find user by username
-    user_found = False
-    user_id = None
-    
-    # In a real system, we would look up the user by username
-    # For demo purposes, we'll just check the demo users
-    for uid in ["1001", "1002"]:
-        user_data = user_db.get_user_detail(int(uid))
-        if user_data and user_data.get("username") == username:
-            user_found = True
-            user_id = int(uid)
-            break
+    user_id = user_db.get_user_id_by_username(username)
+    user_found = user_id is not None
     
     if not user_found:
         print(f"User {username} not found")
@@ -65,22 +98,30 @@ def login(args):
     auth_result, auth_details = auth_system.authenticate(login_input)
     
     # Verify biometric data if available
-    verification_results = {}
+    verifications = []
     user_data = user_db.get_user_detail(user_id)
     
     if "face_data" in login_input and "stored_face" in user_data:
         print("Verifying facial data...")
-        face_result, face_confidence = ai_engine.verify_face(
-            login_input["face_data"], user_data["stored_face"]
+        verifications.append(
+            ("face", ai_engine.verify_face, (login_input["face_data"], user_data["stored_face"]))
         )
-        verification_results["face"] = (face_result, face_confidence)
     
     if "typing_pattern" in login_input and "stored_typing_pattern" in user_data:
         print("Analyzing typing pattern...")
-        typing_result, typing_confidence = ai_engine.analyze_typing(
-            login_input["typing_pattern"], user_data["stored_typing_pattern"]
+        verifications.append(
+            ("typing", ai_engine.analyze_typing,
+             (login_input["typing_pattern"], user_data["stored_typing_pattern"]))
         )
-        verification_results["typing"] = (typing_result, typing_confidence)
+    
+    # The verifications are independent, so they run concurrently; model
+    # inference releases the GIL
+    if len(verifications) > 1:
+        with ThreadPoolExecutor(max_workers=len(verifications)) as executor:
+            futures = {name: executor.submit(fn, *fn_args) for name, fn, fn_args in verifications}
+            verification_results = {name: future.result() for name, future in futures.items()}
+    else:
+        verification_results = {name: fn(*fn_args) for name, fn, fn_args in verifications}
     
     # Calculate overall risk
     risk_level = ai_engine.predict_risk_level(verification_results)
@@ -92,7 +133,7 @@ def login(args):
         
         # Record successful login
         user_db.add_login_record(user_id, {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "device_info": login_input.get("device_info", "Unknown"),
             "location": login_input.get("location", "Unknown"),
             "ip_address": login_input.get("ip_address", "Unknown"),
@@ -139,9 +180,9 @@ def transfer(args):
     amount = args.amount
     
     # Create components
-    user_db = UserDatabase()
-    ai_engine = AIEngine()
-    defense_system = ProactiveDefenseSystem()
+    user_db = _user_db()
+    ai_engine = _ai_engine()
+    defense_system = _defense_system()
     
     # Get user data
     sender_data = user_db.get_user_detail(sender_id)
@@ -171,14 +212,10 @@ def transfer(args):
     # Process transaction
     print("Processing transaction...")
     
-    # Analyze transaction risk
-    risk_factors = []
-    risk_score = 0.0
-    
-    # Check amount against threshold
-    if transaction.amount > 5000:
-        risk_factors.append("Large transaction amount")
-        risk_score += 0.3
+    # Analyze transaction risk: check the amount against every threshold at once
+    hits = transaction.amount > _RISK_THRESHOLDS
+    risk_score = float(hits @ _RISK_WEIGHTS)
+    risk_factors = [_RISK_LABELS[i] for i in np.flatnonzero(hits)]
     
     # Detect potential threat
     activity_data = {
@@ -212,13 +249,14 @@ def transfer(args):
     
     # Update balances (in a real system, this would be handled by a proper database)
     # This is just for demonstration purposes
-    sender_data["balance"] = sender_data.get("balance", 0) - transaction.amount
-    receiver_data["balance"] = receiver_data.get("balance", 0) + transaction.amount
+    sender_balance = sender_data.get("balance", 0) - transaction.amount
+    receiver_balance = receiver_data.get("balance", 0) + transaction.amount
     
-    user_db.update_user(sender_id, {"balance": sender_data["balance"]})
-    user_db.update_user(receiver_id, {"balance": receiver_data["balance"]})
+    user_db.update_user(sender_id, {"balance": sender_balance})
+    user_db.update_user(receiver_id, {"balance": receiver_balance})
+    user_db.flush()
     
-    print(f"New balance for {sender_data['username']}: ${sender_data['balance']:.2f}")
+    print(f"New balance for {sender_data['username']}: ${sender_balance:.2f}")
     
     return True
 
@@ -227,7 +265,7 @@ def security_scan(args):
     """Handle security scan command"""
     print("\n=== AI-Powered Secure Banking System - Security Scan ===\n")
     
-    defense_system = ProactiveDefenseSystem()
+    defense_system = _defense_system()
     scan_results = defense_system.run_security_scan()
     
     print(f"Scan completed at: {scan_results['scan_time']}")
@@ -239,8 +277,8 @@ def security_scan(args):
     return True
 
 
-def main():
-    """Main entry point for the CLI"""
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the CLI commands"""
     parser = argparse.ArgumentParser(description="AI-Powered Secure Banking System CLI")
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
     
@@ -258,16 +296,29 @@ def main():
     # Security scan command
     security_parser = subparsers.add_parser("scan", help="Run a security scan")
     
-    args = parser.parse_args()
+    return parser
+
+
+# Parser and command handlers, built once at import
+_PARSER = _build_parser()
+_DISPATCH = {
+    "login": login,
+    "transfer": transfer,
+    "scan": security_scan
+}
+
+
+def main():
+    """Main entry point for the CLI"""
+    logging.basicConfig(level=logging.WARNING, format=get_config("logging")["log_format"])
+    
+    args = _PARSER.parse_args()
     
-    if args.command == "login":
-        login(args)
-    elif args.command == "transfer":
-        transfer(args)
-    elif args.command == "scan":
-        security_scan(args)
+    handler = _DISPATCH.get(args.command)
+    if handler is None:
+        _PARSER.print_help()
     else:
-        parser.print_help()
+        handler(args)
 
 
 if __name__ == "__main__":
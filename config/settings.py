@@ -2,13 +2,14 @@
 Configuration settings for the banking system
 """
 import os
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
 # Database settings
 DATABASE_FILE = os.path.join("data", "user_data.json")
 
 # Security settings
-SECURITY_SETTINGS = {
+SECURITY_SETTINGS = MappingProxyType({
     "password_min_length": 8,
     "password_require_uppercase": True,
     "password_require_lowercase": True,
@@ -24,15 +25,15 @@ SECURITY_SETTINGS = {
     "location_verification_enabled": True,
     "device_verification_enabled": True,
     "suspicious_transaction_threshold": 5000,
-    "high_risk_countries": [
+    "high_risk_countries": frozenset({
         "CountryA",
         "CountryB",
         "CountryC"
-    ]
-}
+    })
+})
 
 # AI Engine settings
-AI_SETTINGS = {
+AI_SETTINGS = MappingProxyType({
     "face_recognition_model": "FaceNet_v2",
     "typing_pattern_model": "KeystrokeDynamics_v1",
     "location_model": "GeoVerify_v3",
@@ -40,24 +41,24 @@ AI_SETTINGS = {
     "anomaly_detection_threshold": 0.7,
     "continuous_learning_enabled": True,
     "update_frequency_days": 7
-}
+})
 
 # Proactive Defense settings
-DEFENSE_SETTINGS = {
+DEFENSE_SETTINGS = MappingProxyType({
     "threat_scan_interval_minutes": 60,
     "auto_block_suspicious_ips": True,
     "honeypot_enabled": True,
     "self_healing_enabled": True,
     "zero_trust_architecture": True,
     "adaptive_authentication": True,
-    "threat_intelligence_feeds": [
+    "threat_intelligence_feeds": (
         "feed1.example.com",
         "feed2.example.com"
-    ]
-}
+    )
+})
 
 # Notification settings
-NOTIFICATION_SETTINGS = {
+NOTIFICATION_SETTINGS = MappingProxyType({
     "email_notifications_enabled": True,
     "sms_notifications_enabled": True,
     "push_notifications_enabled": True,
@@ -66,43 +67,51 @@ NOTIFICATION_SETTINGS = {
     "notify_on_large_transaction": True,
     "notify_on_suspicious_activity": True,
     "large_transaction_threshold": 1000
-}
+})
 
 # Logging settings
-LOGGING_SETTINGS = {
+LOGGING_SETTINGS = MappingProxyType({
     "log_level": "INFO",
     "log_file": os.path.join("data", "banking.log"),
     "max_log_size_mb": 10,
     "backup_count": 5,
     "log_format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-}
+})
 
 # API settings
-API_SETTINGS = {
+API_SETTINGS = MappingProxyType({
     "rate_limit": 100,  # requests per minute
     "enable_cors": True,
-    "allowed_origins": ["https://example.com"],
+    "allowed_origins": ("https://example.com",),
     "api_keys_enabled": True
-}
+})
+
+# Configuration sections by name, and the value returned for unknown sections
+_CONFIG_MAP = MappingProxyType({
+    "security": SECURITY_SETTINGS,
+    "ai": AI_SETTINGS,
+    "defense": DEFENSE_SETTINGS,
+    "notification": NOTIFICATION_SETTINGS,
+    "logging": LOGGING_SETTINGS,
+    "api": API_SETTINGS
+})
+_EMPTY = MappingProxyType({})
 
 # Get a specific configuration section
-def get_config(section: str) -> Dict[str, Any]:
+def get_config(section: str) -> Mapping[str, Any]:
     """
     Get a specific configuration section
     
+    Sections are read-only mappings, shared by every caller.
+    
     Args:
         section: Name of the configuration section
         
     Returns:
-        Dict[str, Any]: Configuration settings for the specified section
+        Mapping[str, Any]: Configuration settings for the specified section
     """
-    config_map = {
-        "security": SECURITY_SETTINGS,
-        "ai": AI_SETTINGS,
-        "defense": DEFENSE_SETTINGS,
-        "notification": NOTIFICATION_SETTINGS,
-        "logging": LOGGING_SETTINGS,
-        "api": API_SETTINGS
-    }
-    
-    return config_map.get(section.lower(), {})
+    # Exact names skip the lowercasing
+    config = _CONFIG_MAP.get(section)
+    if config is None:
+        config = _CONFIG_MAP.get(section.lower(), _EMPTY)
+    return config
@@ -2,70 +2,155 @@
 AI-Powered Autonomous & Secure Banking System
 Main application entry point
 """
+import hashlib
+import logging
+import logging.handlers
 import os
-import time
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
 
 # Import core components
 from app.models.customer import Customer
-from app.interfaces.login_interface import LoginInterface
+from app.interfaces.login_interface import LoginInput, LoginInterface, new_session_id
 from app.security.authentication_system import AuthenticationSystem
 from app.ai.ai_engine import AIEngine
 from app.models.user_database import UserDatabase
 from app.security.proactive_defense_system import ProactiveDefenseSystem
 from app.models.transaction import Transaction
+from app.security.transaction_scoring import score_transaction, decode_risk_factors
+from app.utils import serialization
 from app.utils.encryption import hash_password, verify_password, generate_token
 
 # Import configuration
 from config.settings import get_config
 
 
-def setup_demo_data(user_db: UserDatabase) -> Dict[int, Dict[str, Any]]:
+# Security settings are read-only, so they are looked up once at import
+_SECURITY = get_config("security")
+_SUSPICIOUS_TX_THRESHOLD = _SECURITY.get("suspicious_transaction_threshold", 5000)
+
+# Demo output goes through the "bank" logger; main() configures it to write
+# to stdout through a memory handler of this many records
+LOG_BUFFER_CAPACITY = 1024
+
+log = logging.getLogger("bank")
+
+# Number of login evaluations kept for reuse by repeated identical attempts
+EVALUATION_CACHE_SIZE = 4096
+
+# Content hash of a login attempt to its (factor scores, risk level)
+_evaluation_cache: Dict[bytes, Tuple[np.ndarray, float]] = {}
+
+# Login input fields the verifications never read; the credentials are kept
+# out of the cache key so an unsalted digest of the password is never stored
+_EVALUATION_KEY_EXCLUDED = frozenset({"username", "password"})
+
+
+def _evaluation_key(user_db: UserDatabase, user_id: int, login_input: Dict[str, Any],
+                    biometrics: bool = True) -> bytes:
+    """
+    Derive the cache key of a login evaluation
+    
+    The key hashes the canonical JSON of the login input, without the
+    credentials, together with the database instance and its version, so
+    recording a login or trusting a device invalidates every cached
+    evaluation for that database. In-memory databases all share one data
+    file name, and every instance counts its version up from zero, so the
+    instance ID keeps different databases apart.
+    
+    Args:
+        user_db: Database the stored user data comes from
+        user_id: Unique identifier for the user
+        login_input: Collected login input
+        biometrics: Whether the evaluation includes the face and typing checks
+        
+    Returns:
+        bytes: BLAKE2b digest identifying the evaluation
+    """
+    canonical = serialization.dumps({
+        "database": user_db.instance_id,
+        "version": user_db.version,
+        "user_id": user_id,
+        "biometrics": biometrics,
+        "input": {name: value for name, value in login_input.items()
+                  if name not in _EVALUATION_KEY_EXCLUDED}
+    }, sort_keys=True)
+    return hashlib.blake2b(canonical, digest_size=16).digest()
+
+
+# Components shared by the demo steps, created on first use
+@lru_cache(maxsize=1)
+def _user_db() -> UserDatabase:
+    return UserDatabase()
+
+
+@lru_cache(maxsize=1)
+def _auth_system() -> AuthenticationSystem:
+    return AuthenticationSystem()
+
+
+@lru_cache(maxsize=1)
+def _ai_engine() -> AIEngine:
+    return AIEngine()
+
+
+@lru_cache(maxsize=1)
+def _defense_system() -> ProactiveDefenseSystem:
+    return ProactiveDefenseSystem()
+
+
+@lru_cache(maxsize=1)
+def _verification_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=len(AIEngine.FACTORS), thread_name_prefix="verify")
+
+
+def setup_demo_data(user_db: UserDatabase) -> Dict[str, Any]:
     """
     Set up demo data for the banking system
     
+    The demo users are laid out column-wise, one parallel sequence per
+    field, so they can be hashed, checked and inserted as a batch.
+    
     Args:
         user_db: UserDatabase instance
         
     Returns:
-        Dict[int, Dict[str, Any]]: Dictionary of demo users
+        Dict[str, Any]: Demo user columns, keyed by field name
     """
-    print("\n=== Setting up demo data ===")
+    log.info("\n=== Setting up demo data ===")
     
     # Create demo users
     demo_users = {
-        1001: {
-            "username": "angel_abubakar",   
-            "password": "Password@123",
-            "face_data": "base64_encoded_face_data_for_angel",
-            "typing_pattern": "angel_typing_pattern_data",
-            "email": "angel_abubakar@gmail.com",
-            "phone": "+963123456789",
-            "balance": 5000.0
-        },
-        1002: {
-            "username": "ahmad_ali",
-            "password": "Password@456",
-            "face_data": "base64_encoded_sface_data_for_ahmad",
-            "typing_pattern": "ahmad_typing_pattern_data",
-            "email": "ahmad.ali@hotmail.com",
-            "phone": "+963123456780",
-            "balance": 7500.0
-        }
+        "user_id": np.array([1001, 1002], dtype=np.int64),
+        "username": ["angel_abubakar", "ahmad_ali"],
+        "password": ["Password@123", "Password@456"],
+        "face_data": ["base64_encoded_face_data_for_angel", "base64_encoded_sface_data_for_ahmad"],
+        "typing_pattern": ["angel_typing_pattern_data", "ahmad_typing_pattern_data"],
+        "email": ["angel_abubakar@gmail.com", "ahmad.ali@hotmail.com"],
+        "phone": ["+963123456789", "+963123456780"],
+        "balance": np.array([5000.0, 7500.0], dtype=np.float64)
     }
-    
-    # Add users to database
-    for user_id, user_data in demo_users.items():
-        # Hash the password before storing
-        password = user_data.pop("password")
-        password_hash, salt = hash_password(password)
-        user_data["password_hash"] = password_hash
-        user_data["password_salt"] = salt
-        
-        # Add user to database
-        user_db.add_user(user_id, user_data)
-        print(f"Added demo user: {user_data['username']} (ID: {user_id})")
+    if (demo_users["balance"] < 0).any():
+        raise ValueError("Demo user balances must not be negative")
+    
+    # Hash the passwords before storing; PBKDF2 releases the GIL, so the
+    # hashes are computed on all cores at once
+    columns = {name: values for name, values in demo_users.items() if name not in ("user_id", "password")}
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        columns["password_hash"], columns["password_salt"] = zip(
+            *executor.map(hash_password, demo_users["password"]))
+    
+    # Add users to database in one batch
+    user_ids = demo_users["user_id"].tolist()
+    user_db.add_users_bulk(user_ids, columns)
+    
+    for user_id, username in zip(user_ids, demo_users["username"]):
+        log.info(f"Added demo user: {username} (ID: {user_id})")
         
         # Add a trusted device
         user_db.add_trusted_device(user_id, "Windows 11, Chrome 98.0.4758.102")
@@ -73,43 +158,115 @@ def setup_demo_data(user_db: UserDatabase) -> Dict[int, Dict[str, Any]]:
         # Add some login history
         for _ in range(3):
             user_db.add_login_record(user_id, {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
                 "device_info": "Windows 11, Chrome 98.0.4758.102",
                 "location": "33.5102,36.29128",  # Damascus coordinates
                 "ip_address": "192.168.1.1",
                 "success": True
             })
     
+    # Write the demo data out now, so it is on disk even if a later step fails
+    user_db.flush()
+    
     return demo_users
 
 
-def simulate_login(user_id: int, username: str, password: str, is_legitimate: bool = True) -> None:
+def _verify_login(user_db: UserDatabase, user_id: int, user_data: Dict[str, Any],
+                  login_input: Dict[str, Any], biometrics: bool = True) -> Tuple[np.ndarray, float]:
     """
-    Simulate a login attempt
+    Run the AI verifications for a login attempt
+    
+    The verifications depend only on the input and the stored user data, so
+    a repeated attempt against an unchanged database reuses their result.
     
     Args:
-        user_id: User ID
-        username: Username
-        password: Password
-        is_legitimate: Whether this is a legitimate login attempt
+        user_db: Database the stored user data comes from
+        user_id: Unique identifier for the user
+        user_data: Stored user data
+        login_input: Collected login input
+        biometrics: Whether to run the face and typing checks; skipped
+                    checks are scored as failed (zero confidence)
+        
+    Returns:
+        Tuple[np.ndarray, float]: Factor scores and the overall risk level
     """
-    print(f"\n=== Simulating {'legitimate' if is_legitimate else 'suspicious'} login for {username} ===")
+    cache_key = _evaluation_key(user_db, user_id, login_input, biometrics)
+    cached = _evaluation_cache.get(cache_key)
+    if cached is not None:
+        log.info("Reusing verification results for identical login input...")
+        return cached
     
-    # Create components
-    session_id = int(time.time())
-    login_interface = LoginInterface(session_id)
-    auth_system = AuthenticationSystem()
-    ai_engine = AIEngine()
-    user_db = UserDatabase()
+    ai_engine = _ai_engine()
     
-    # Get user data
-    user_data = user_db.get_user_detail(user_id)
-    if not user_data:
-        print(f"User {username} not found")
-        return
+    # Verify biometric data if available
+    verifications = []
+    if biometrics and "face_data" in login_input and "stored_face" in user_data:
+        log.info("Verifying facial data...")
+        verifications.append(
+            (AIEngine.FACTOR_FACE, ai_engine.verify_face,
+             (login_input["face_data"], user_data["stored_face"]))
+        )
     
-    # Collect login input
-    print("Collecting login input...")
+    if biometrics and "typing_pattern" in login_input and "stored_typing_pattern" in user_data:
+        log.info("Analyzing typing pattern...")
+        verifications.append(
+            (AIEngine.FACTOR_TYPING, ai_engine.analyze_typing,
+             (login_input["typing_pattern"], user_data["stored_typing_pattern"]))
+        )
+    
+    if "location" in login_input and "historical_logins" in user_data:
+        log.info("Verifying location...")
+        # The database keeps each distinct login location parsed into coordinates
+        verifications.append(
+            (AIEngine.FACTOR_LOCATION, ai_engine.verify_location_vec,
+             (login_input["location"], user_db.get_login_coordinates(user_id)))
+        )
+    
+    if "device_info" in login_input and "trusted_devices" in user_data:
+        log.info("Verifying device...")
+        verifications.append(
+            (AIEngine.FACTOR_DEVICE, ai_engine.verify_device,
+             (login_input["device_info"], user_db.get_trusted_device_index(user_id)))
+        )
+    
+    # The verifications are independent, so they run concurrently on the
+    # shared executor; model inference and NumPy kernels release the GIL
+    futures = [
+        (factor, _verification_executor().submit(fn, *fn_args))
+        for factor, fn, fn_args in verifications
+    ]
+    
+    # Scores are indexed by factor; NaN marks a verification that did not run
+    scores = np.full(len(AIEngine.FACTORS), np.nan)
+    if not biometrics:
+        scores[[AIEngine.FACTOR_FACE, AIEngine.FACTOR_TYPING]] = 0.0
+    for factor, future in futures:
+        scores[factor] = future.result()[1]
+    
+    # Calculate overall risk
+    risk_level = ai_engine.predict_risk_level_vec(scores)
+    
+    if len(_evaluation_cache) >= EVALUATION_CACHE_SIZE:
+        # Dicts keep insertion order, so this evicts the oldest entry
+        _evaluation_cache.pop(next(iter(_evaluation_cache)), None)
+    _evaluation_cache[cache_key] = (scores, risk_level)
+    return (scores, risk_level)
+
+
+def _collect_login_input(login_interface: LoginInterface, username: str, password: str,
+                         is_legitimate: bool) -> Dict[str, Any]:
+    """
+    Collect simulated login input for the given credentials
+    
+    Args:
+        login_interface: Session to collect the input from
+        username: Username
+        password: Password
+        is_legitimate: Whether this is a legitimate login attempt
+        
+    Returns:
+        Dict[str, Any]: Login input
+    """
     login_input = login_interface.collect_input()
     
     # Override with provided credentials
@@ -122,64 +279,73 @@ def simulate_login(user_id: int, username: str, password: str, is_legitimate: bo
         login_input["location"] = "1.2921,36.8219"  # Nairobi coordinates
         login_input["ip_address"] = "203.0.113.42"  # Example suspicious IP
     
-    # Send to authentication
-    print("Sending to authentication system...")
-    login_interface.send_to_authentication(login_input)
+    return login_input
+
+
+def simulate_login(user_id: int, username: str, password: str, is_legitimate: bool = True,
+                   user_db: Optional[UserDatabase] = None) -> None:
+    """
+    Simulate a login attempt
     
-    # Perform authentication
-    auth_result, auth_details = auth_system.authenticate(login_input)
+    Args:
+        user_id: User ID
+        username: Username
+        password: Password
+        is_legitimate: Whether this is a legitimate login attempt
+        user_db: Database to use instead of the shared default database
+    """
+    log.info(f"\n=== Simulating {'legitimate' if is_legitimate else 'suspicious'} login for {username} ===")
     
-    # Verify biometric data if available
-    verification_results = {}
-    if "face_data" in login_input and "stored_face" in user_data:
-        print("Verifying facial data...")
-        face_result, face_confidence = ai_engine.verify_face(
-            login_input["face_data"], user_data["stored_face"]
-        )
-        verification_results["face"] = (face_result, face_confidence)
+    # Read the clock once; both login records share this time
+    now = datetime.now()
     
-    if "typing_pattern" in login_input and "stored_typing_pattern" in user_data:
-        print("Analyzing typing pattern...")
-        typing_result, typing_confidence = ai_engine.analyze_typing(
-            login_input["typing_pattern"], user_data["stored_typing_pattern"]
-        )
-        verification_results["typing"] = (typing_result, typing_confidence)
+    # Create components
+    login_interface = LoginInterface(new_session_id())
+    auth_system = _auth_system()
+    user_db = user_db or _user_db()
     
-    if "location" in login_input and "historical_logins" in user_data:
-        print("Verifying location...")
-        historical_locations = [
-            login.get("location", "") 
-            for login in user_data.get("historical_logins", [])
-            if "location" in login
-        ]
-        location_result, location_risk = ai_engine.verify_location(
-            login_input["location"], historical_locations
-        )
-        verification_results["location"] = (location_result, location_risk)
+    # Get user data
+    user_data = user_db.get_user_detail(user_id)
+    if not user_data:
+        log.info(f"User {username} not found")
+        return
     
-    if "device_info" in login_input and "trusted_devices" in user_data:
-        print("Verifying device...")
-        device_result, device_risk = ai_engine.verify_device(
-            login_input["device_info"], user_data.get("trusted_devices", [])
-        )
-        verification_results["device"] = (device_result, device_risk)
+    # Collect login input
+    log.info("Collecting login input...")
+    login_input = _collect_login_input(login_interface, username, password, is_legitimate)
     
-    # Calculate overall risk
-    risk_level = ai_engine.predict_risk_level(verification_results)
-    print(f"Calculated risk level: {risk_level:.2f}")
+    # Send to authentication
+    log.info("Sending to authentication system...")
+    login_interface.send_to_authentication(login_input)
+    
+    # Perform authentication; the fixed-field form is read by position
+    auth_result, auth_details = auth_system.authenticate(LoginInput.from_dict(login_input))
+    
+    if auth_result:
+        _, risk_level = _verify_login(user_db, user_id, user_data, login_input)
+    else:
+        # The login is denied whatever the biometrics find, so those checks
+        # are skipped and scored as failed. Location and device still decide
+        # whether the attempt is risky enough to block; the authentication
+        # risk alone is capped at 0.7, below the blocking threshold
+        log.info("Authentication failed, skipping biometric verification...")
+        _, verified_risk = _verify_login(user_db, user_id, user_data, login_input, biometrics=False)
+        risk_level = max(auth_details["risk_level"], verified_risk)
+    
+    log.info(f"Calculated risk level: {risk_level:.2f}")
     
     # Compare with historical patterns
     comparison = user_db.compare_with_current(user_id, login_input)
     if comparison.get("anomalies"):
-        print(f"Detected anomalies: {', '.join(comparison.get('anomalies', []))}")
+        log.info(f"Detected anomalies: {', '.join(comparison.get('anomalies', []))}")
     
     # Determine authentication result
     if auth_result and risk_level < 0.5:
-        print(f"Login successful for {username}")
+        log.info(f"Login successful for {username}")
         
         # Record successful login
         user_db.add_login_record(user_id, {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now,
             "device_info": login_input.get("device_info", "Unknown"),
             "location": login_input.get("location", "Unknown"),
             "ip_address": login_input.get("ip_address", "Unknown"),
@@ -188,21 +354,21 @@ def simulate_login(user_id: int, username: str, password: str, is_legitimate: bo
         })
         
         # Add device to trusted devices if not already trusted
-        if "device_info" in login_input and login_input["device_info"] not in user_data.get("trusted_devices", []):
+        if "device_info" in login_input and not user_db.is_trusted_device(user_id, login_input["device_info"]):
             user_db.add_trusted_device(user_id, login_input["device_info"])
-            print(f"Added {login_input['device_info']} to trusted devices")
+            log.info(f"Added {login_input['device_info']} to trusted devices")
     
     elif auth_result and 0.5 <= risk_level < 0.7:
-        print(f"Login requires additional verification for {username}")
-        print("Sending additional verification request...")
+        log.info(f"Login requires additional verification for {username}")
+        log.info("Sending additional verification request...")
         auth_system.request_additional_verification("sms")
     
     else:
-        print(f"Login denied for {username}")
+        log.info(f"Login denied for {username}")
         
         # Record failed login
         user_db.add_login_record(user_id, {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now,
             "device_info": login_input.get("device_info", "Unknown"),
             "location": login_input.get("location", "Unknown"),
             "ip_address": login_input.get("ip_address", "Unknown"),
@@ -211,7 +377,7 @@ def simulate_login(user_id: int, username: str, password: str, is_legitimate: bo
         })
         
         # Check for potential threat
-        defense_system = ProactiveDefenseSystem()
+        defense_system = _defense_system()
         activity_data = {
             "login_attempts": 1,
             "username": username,
@@ -223,8 +389,8 @@ def simulate_login(user_id: int, username: str, password: str, is_legitimate: bo
         
         threat_detected, threat_info = defense_system.detect_threat(activity_data)
         if threat_detected:
-            print(f"Threat detected: {threat_info.get('threat_details', {}).get('type', 'Unknown')}")
-            print(f"Response plan: {threat_info.get('response_plan', 'Unknown')}")
+            log.info(f"Threat detected: {threat_info.get('threat_details', {}).get('type', 'Unknown')}")
+            log.info(f"Response plan: {threat_info.get('response_plan', 'Unknown')}")
             
             # Block access if high risk
             if risk_level > 0.8:
@@ -232,7 +398,7 @@ def simulate_login(user_id: int, username: str, password: str, is_legitimate: bo
                     "ip_address": login_input.get("ip_address", "Unknown"),
                     "reason": "High risk login attempt"
                 })
-                print(f"Blocked access from IP: {login_input.get('ip_address', 'Unknown')}")
+                log.info(f"Blocked access from IP: {login_input.get('ip_address', 'Unknown')}")
             
             # Alert security team
             defense_system.alert_security_team({
@@ -240,10 +406,113 @@ def simulate_login(user_id: int, username: str, password: str, is_legitimate: bo
                 "risk_level": risk_level,
                 "details": login_input
             })
-            print("Security team alerted")
+            log.info("Security team alerted")
+    
+    user_db.flush()
 
 
-def simulate_transaction(sender_id: int, receiver_id: int, amount: float, is_legitimate: bool = True) -> None:
+def simulate_logins_batch(login_batch: List[Dict[str, Any]],
+                          user_db: Optional[UserDatabase] = None) -> np.ndarray:
+    """
+    Simulate a queue of login attempts, scoring them all at once
+    
+    Meant for offline replay and red-team runs: authentication and every
+    verification run once per batch over arrays instead of once per login.
+    The outcomes are recorded with a single append to the login file;
+    unlike simulate_login, no devices are trusted and no threats are raised.
+    
+    Args:
+        login_batch: Login attempts with "user_id", "username" and "password"
+                     keys, and optionally "is_legitimate" (default True)
+        user_db: Database to use instead of the shared default database
+        
+    Returns:
+        np.ndarray: Risk level per attempt, NaN for unknown users
+    """
+    log.info(f"\n=== Simulating batch of {len(login_batch)} logins ===")
+    
+    now = datetime.now()
+    auth_system = _auth_system()
+    ai_engine = _ai_engine()
+    user_db = user_db or _user_db()
+    
+    risk_levels = np.full(len(login_batch), np.nan)
+    
+    # Skip attempts for unknown users
+    attempts = []
+    for position, attempt in enumerate(login_batch):
+        user_data = user_db.get_user_detail(attempt["user_id"])
+        if user_data is None:
+            log.info(f"User {attempt['username']} not found")
+            continue
+        login_input = _collect_login_input(
+            LoginInterface(new_session_id()), attempt["username"], attempt["password"],
+            attempt.get("is_legitimate", True)
+        )
+        attempts.append((position, attempt["user_id"], user_data, login_input))
+    if not attempts:
+        return risk_levels
+    
+    positions = np.array([position for position, _, _, _ in attempts])
+    auth_results, auth_risks = auth_system.authenticate_batch([login_input for *_, login_input in attempts])
+    
+    # Verify the attempts, one batch call per factor; rows of scores are
+    # indexed by attempt and NaN marks a missing factor. As in simulate_login,
+    # failed authentications skip the biometric checks and score them as failed
+    scores = np.full((len(attempts), len(AIEngine.FACTORS)), np.nan)
+    scores[~auth_results, AIEngine.FACTOR_FACE] = 0.0
+    scores[~auth_results, AIEngine.FACTOR_TYPING] = 0.0
+    # Each check is (factor, biometric, input key, stored key, stored value getter, batch verifier)
+    checks = (
+        (AIEngine.FACTOR_FACE, True, "face_data", "stored_face",
+         lambda user_id, user_data: user_data["stored_face"], ai_engine.verify_face_batch),
+        (AIEngine.FACTOR_TYPING, True, "typing_pattern", "stored_typing_pattern",
+         lambda user_id, user_data: user_data["stored_typing_pattern"], ai_engine.analyze_typing_batch),
+        (AIEngine.FACTOR_LOCATION, False, "location", "historical_logins",
+         lambda user_id, user_data: user_db.get_login_coordinates(user_id),
+         lambda pairs: ai_engine.verify_location_vec_batch(*zip(*pairs))),
+        (AIEngine.FACTOR_DEVICE, False, "device_info", "trusted_devices",
+         lambda user_id, user_data: user_db.get_trusted_device_index(user_id), ai_engine.verify_device_batch)
+    )
+    for factor, biometric, input_key, stored_key, get_stored, verify in checks:
+        rows = [row for row, (_, _, user_data, login_input) in enumerate(attempts)
+                if (auth_results[row] or not biometric)
+                and input_key in login_input and stored_key in user_data]
+        if rows:
+            pairs = [(attempts[row][3][input_key], get_stored(attempts[row][1], attempts[row][2]))
+                     for row in rows]
+            scores[rows, factor] = verify(pairs)[1]
+    
+    # Failed authentications never score below the authentication system's risk
+    batch_risks = ai_engine.predict_risk_level_batch(scores)
+    batch_risks[~auth_results] = np.maximum(batch_risks[~auth_results], auth_risks[~auth_results])
+    risk_levels[positions] = batch_risks
+    
+    # Record successes and denials; attempts needing additional verification
+    # are left unrecorded, as in simulate_login
+    success = auth_results & (batch_risks < 0.5)
+    denied = ~auth_results | (batch_risks >= 0.7)
+    user_db.add_login_records(
+        (user_id, {
+            "timestamp": now,
+            "device_info": login_input.get("device_info", "Unknown"),
+            "location": login_input.get("location", "Unknown"),
+            "ip_address": login_input.get("ip_address", "Unknown"),
+            "success": bool(success[i]),
+            "risk_level": float(batch_risks[i])
+        })
+        for i, (_, user_id, _, login_input) in enumerate(attempts)
+        if success[i] or denied[i]
+    )
+    user_db.flush()
+    
+    log.info(f"Successful: {int(success.sum())}, additional verification: "
+             f"{int((~success & ~denied).sum())}, denied: {int(denied.sum())}")
+    return risk_levels
+
+
+def simulate_transaction(sender_id: int, receiver_id: int, amount: float, is_legitimate: bool = True,
+                         user_db: Optional[UserDatabase] = None) -> None:
     """
     Simulate a financial transaction
     
@@ -252,20 +521,21 @@ def simulate_transaction(sender_id: int, receiver_id: int, amount: float, is_leg
         receiver_id: Receiver's user ID
         amount: Transaction amount
         is_legitimate: Whether this is a legitimate transaction
+        user_db: Database to use instead of the shared default database
     """
-    print(f"\n=== Simulating {'legitimate' if is_legitimate else 'suspicious'} transaction ===")
+    log.info(f"\n=== Simulating {'legitimate' if is_legitimate else 'suspicious'} transaction ===")
     
     # Create components
-    user_db = UserDatabase()
-    ai_engine = AIEngine()
-    defense_system = ProactiveDefenseSystem()
+    user_db = user_db or _user_db()
+    ai_engine = _ai_engine()
+    defense_system = _defense_system()
     
     # Get user data
     sender_data = user_db.get_user_detail(sender_id)
     receiver_data = user_db.get_user_detail(receiver_id)
     
     if not sender_data or not receiver_data:
-        print("Sender or receiver not found")
+        log.info("Sender or receiver not found")
         return
     
     # Create transaction
@@ -276,45 +546,28 @@ def simulate_transaction(sender_id: int, receiver_id: int, amount: float, is_leg
         description=f"Payment from {sender_data['username']} to {receiver_data['username']}"
     )
     
-    print(f"Transaction created: {transaction}")
-    print(f"Amount: ${amount:.2f}")
+    log.info(f"Transaction created: {transaction}")
+    log.info(f"Amount: ${amount:.2f}")
     
     # If simulating suspicious transaction, modify amount
     if not is_legitimate:
         # Make it a very large amount
         transaction.amount = 50000.0
-        print(f"Modified amount to: ${transaction.amount:.2f}")
+        log.info(f"Modified amount to: ${transaction.amount:.2f}")
     
     # Check if sender has sufficient balance
     if transaction.amount > sender_data.get("balance", 0):
-        print("Insufficient balance")
+        log.info("Insufficient balance")
         transaction.fail("Insufficient balance")
         return
     
-    # Check transaction against security settings
-    security_settings = get_config("security")
-    suspicious_threshold = security_settings.get("suspicious_transaction_threshold", 5000)
-    
-    # Analyze transaction risk
-    risk_factors = []
-    risk_score = 0.0
-    
-    # Check amount against threshold
-    if transaction.amount > suspicious_threshold:
-        risk_factors.append("Large transaction amount")
-        risk_score += 0.3
-    
-    # Check if receiver is new (not in historical transactions)
-    # In a real system, we would check the sender's transaction history
-    if not is_legitimate:
-        risk_factors.append("New receiver")
-        risk_score += 0.2
-    
-    # Check for unusual time
-    current_hour = datetime.now().hour
-    if 1 <= current_hour <= 4:  # Unusual hours
-        risk_factors.append("Unusual transaction time")
-        risk_score += 0.2
+    # Analyze transaction risk against the amount threshold, the receiver
+    # and the time of day; the receiver counts as new for suspicious
+    # transactions, where a real system would check the sender's history
+    risk_score, risk_mask = score_transaction(
+        transaction.amount, datetime.now().hour, not is_legitimate, _SUSPICIOUS_TX_THRESHOLD
+    )
+    risk_factors = decode_risk_factors(risk_mask)
     
     # Check for unusual location (if available)
     # In a real system, we would compare with the user's usual transaction locations
@@ -330,16 +583,16 @@ def simulate_transaction(sender_id: int, receiver_id: int, amount: float, is_leg
     
     # Process transaction based on risk assessment
     if risk_score > 0.7 or threat_detected:
-        print(f"High risk transaction detected (score: {risk_score:.2f})")
-        print(f"Risk factors: {', '.join(risk_factors)}")
+        log.info(f"High risk transaction detected (score: {risk_score:.2f})")
+        log.info(f"Risk factors: {', '.join(risk_factors)}")
         
         if threat_detected:
-            print(f"Threat detected: {threat_info.get('threat_details', {}).get('type', 'Unknown')}")
-            print(f"Response plan: {threat_info.get('response_plan', 'Unknown')}")
+            log.info(f"Threat detected: {threat_info.get('threat_details', {}).get('type', 'Unknown')}")
+            log.info(f"Response plan: {threat_info.get('response_plan', 'Unknown')}")
         
         # Flag transaction for review
         transaction.flag_for_review(risk_score)
-        print("Transaction flagged for review")
+        log.info("Transaction flagged for review")
         
         # Alert security team for high-risk transactions
         if risk_score > 0.8:
@@ -349,59 +602,81 @@ def simulate_transaction(sender_id: int, receiver_id: int, amount: float, is_leg
                 "risk_score": risk_score,
                 "risk_factors": risk_factors
             })
-            print("Security team alerted")
+            log.info("Security team alerted")
     
     elif 0.4 < risk_score <= 0.7:
-        print(f"Medium risk transaction detected (score: {risk_score:.2f})")
-        print(f"Risk factors: {', '.join(risk_factors)}")
+        log.info(f"Medium risk transaction detected (score: {risk_score:.2f})")
+        log.info(f"Risk factors: {', '.join(risk_factors)}")
         
         # In a real system, we would request additional verification
-        print("Requesting additional verification from user")
+        log.info("Requesting additional verification from user")
         
         # For demo purposes, we'll complete the transaction
         transaction.complete()
-        print("Transaction completed after verification")
+        log.info("Transaction completed after verification")
     
     else:
-        print(f"Low risk transaction (score: {risk_score:.2f})")
+        log.info(f"Low risk transaction (score: {risk_score:.2f})")
         
         # Complete the transaction
         transaction.complete()
-        print("Transaction completed successfully")
+        log.info("Transaction completed successfully")
     
     # Update transaction status
-    print(f"Final transaction status: {transaction.status}")
+    log.info(f"Final transaction status: {transaction.status}")
 
 
 def run_security_scan() -> None:
     """Run a comprehensive security scan"""
-    print("\n=== Running Security Scan ===")
+    log.info("\n=== Running Security Scan ===")
     
-    defense_system = ProactiveDefenseSystem()
+    defense_system = _defense_system()
     scan_results = defense_system.run_security_scan()
     
-    print(f"Scan completed at: {scan_results['scan_time']}")
-    print(f"Vulnerabilities found: {scan_results['vulnerabilities_found']}")
-    print(f"Suspicious patterns: {scan_results['suspicious_patterns']}")
-    print(f"Current threat level: {scan_results['threat_level']}")
-    print(f"Response plan: {scan_results['response_plan']}")
+    log.info(f"Scan completed at: {scan_results['scan_time']}")
+    log.info(f"Vulnerabilities found: {scan_results['vulnerabilities_found']}")
+    log.info(f"Suspicious patterns: {scan_results['suspicious_patterns']}")
+    log.info(f"Current threat level: {scan_results['threat_level']}")
+    log.info(f"Response plan: {scan_results['response_plan']}")
+
+
+def _configure_logging() -> logging.handlers.MemoryHandler:
+    """
+    Send the demo output of the "bank" logger to stdout
+    
+    The memory handler batches the records and writes them to stdout together
+    instead of once per line.
+    
+    Returns:
+        logging.handlers.MemoryHandler: Buffer to flush once the demo is done
+    """
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter("%(message)s"))
+    log_buffer = logging.handlers.MemoryHandler(LOG_BUFFER_CAPACITY, target=output)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    log.addHandler(log_buffer)
+    return log_buffer
 
 
 def main() -> None:
     """Main application entry point"""
-    print("=" * 80)
-    print("AI-POWERED AUTONOMOUS & SECURE BANKING SYSTEM")
-    print("=" * 80)
+    logging.basicConfig(level=logging.WARNING, format=get_config("logging")["log_format"])
+    log_buffer = _configure_logging()
+    
+    log.info("=" * 80)
+    log.info("AI-POWERED AUTONOMOUS & SECURE BANKING SYSTEM")
+    log.info("=" * 80)
     
     # Initialize database
-    user_db = UserDatabase()
+    user_db = _user_db()
     
     # Set up demo data
     demo_users = setup_demo_data(user_db)
     
     # Simulate legitimate login
-    user_id = 1001
-    username = demo_users[user_id]["username"]
+    user_id = int(demo_users["user_id"][0])
+    username = demo_users["username"][0]
     password = "SecureP@ss123"  # Original password before hashing
     simulate_login(user_id, username, password, is_legitimate=True)
     
@@ -417,9 +692,10 @@ def main() -> None:
     # Run security scan
     run_security_scan()
     
-    print("\n" + "=" * 80)
-    print("DEMO COMPLETED")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info("DEMO COMPLETED")
+    log.info("=" * 80)
+    log_buffer.flush()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 """
 Run tests for the banking system
 """
+import importlib.util
 import unittest
 import sys
 import os
@@ -9,7 +10,15 @@ import os
 def run_tests():
     """Run all tests for the banking system"""
     # Ensure the tests directory is in the Python path
-    sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+    root = os.path.abspath(os.path.dirname(__file__))
+    sys.path.insert(0, root)
+    
+    # With pytest-xdist installed the tests are spread over every core;
+    # each test builds its own database, so they can run in any order.
+    # xdist is only looked up, since pytest must import its plugins itself
+    if importlib.util.find_spec("pytest") and importlib.util.find_spec("xdist"):
+        import pytest
+        return int(pytest.main(["-n", "auto", os.path.join(root, "tests")]))
     
     # Discover and run all tests
     test_suite = unittest.defaultTestLoader.discover('tests')
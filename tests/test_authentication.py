@@ -1,11 +1,24 @@
 """
 Tests for the authentication system
 """
+import base64
+import os
+import tempfile
 import unittest
+from unittest import mock
+import numpy as np
+import main
 from datetime import datetime
 from app.security.authentication_system import AuthenticationSystem
 from app.ai.ai_engine import AIEngine
+from app.interfaces.login_interface import LoginInput
 from app.models.user_database import UserDatabase
+from app.utils.encryption import (
+    hash_password, verify_password, encrypt_sensitive_data, decrypt_sensitive_data,
+    encode_biometric_data, decode_biometric_data_into
+)
+from app.utils.geo import haversine_km
+from app.utils import _b64_swar
 
 
 class TestAuthentication(unittest.TestCase):
@@ -15,7 +28,7 @@ class TestAuthentication(unittest.TestCase):
         """Set up test fixtures"""
         self.auth_system = AuthenticationSystem()
         self.ai_engine = AIEngine()
-        self.user_db = UserDatabase("tests/test_data.json")
+        self.user_db = UserDatabase(UserDatabase.MEMORY)
         
         # Create a test user
         self.test_user_id = 9999
@@ -47,8 +60,8 @@ class TestAuthentication(unittest.TestCase):
     
     def tearDown(self):
         """Clean up after tests"""
-        # In a real test, we would clean up the test database
-        pass
+        # The database lives in memory, so dropping it leaves nothing behind
+        self.user_db = None
     
     def test_authentication_success(self):
         """Test successful authentication"""
@@ -92,6 +105,111 @@ class TestAuthentication(unittest.TestCase):
         self.assertLessEqual(risk_level, 1.0)
         self.assertGreaterEqual(len(self.auth_system.risk_factors), 1)
     
+    def test_authentication_batch(self):
+        """Test batch authentication against single authentication"""
+        logins = [
+            {"username": "test_user", "face_data": "test_face_data", "typing_pattern": "test_typing_pattern"},
+            {"username": "test_user", "typing_pattern": "test_typing_pattern"},
+            {"username": "test_user"}
+        ]
+        results, risk_levels = self.auth_system.authenticate_batch(logins)
+        expected = [self.auth_system.authenticate(login) for login in logins]
+        self.assertEqual(results.tolist(), [result for result, _ in expected])
+        self.assertEqual(risk_levels.tolist(), [details["risk_level"] for _, details in expected])
+        self.assertEqual(len(self.auth_system.authentication_history), 6)
+        
+        # The fixed-field login input is scored like the dictionary
+        login = LoginInput.from_dict(logins[1])
+        self.assertIsNone(login.face_data)
+        self.assertEqual(self.auth_system.authenticate(login)[1]["risk_level"], risk_levels[1])
+    
+    def test_failed_login_blocks_high_risk_attempt(self):
+        """Test that a denied login from an unknown place and device is blocked"""
+        defense_system = mock.Mock()
+        defense_system.detect_threat.return_value = (True, {})
+        with mock.patch.object(AuthenticationSystem, "authenticate",
+                               return_value=(False, {"risk_level": 0.7})), \
+                mock.patch.object(main, "_defense_system", return_value=defense_system), \
+                self.assertLogs("bank") as logs:
+            main.simulate_login(self.test_user_id, "test_user", "wrong_password",
+                                is_legitimate=False, user_db=self.user_db)
+        
+        defense_system.block_access.assert_called_once()
+        self.assertEqual(defense_system.block_access.call_args[0][0]["ip_address"], "203.0.113.42")
+        self.assertNotIn("Verifying facial data...", [record.getMessage() for record in logs.records])
+    
+    def test_evaluation_cache_key(self):
+        """Test that login evaluations are keyed without credentials and by database version"""
+        login_input = {"username": "test_user", "password": "secret",
+                       "device_info": "Test Device", "location": "48.8566,2.3522"}
+        key = main._evaluation_key(self.user_db, self.test_user_id, login_input)
+        
+        # The credentials are not part of the key
+        self.assertEqual(main._evaluation_key(self.user_db, self.test_user_id,
+                                              dict(login_input, password="other")), key)
+        
+        # Another database at the same version misses the cache
+        other_db = UserDatabase(UserDatabase.MEMORY)
+        other_db.add_user(self.test_user_id, dict(self.test_user_data))
+        other_db.add_trusted_device(self.test_user_id, "Other Device")
+        other_db.add_login_record(self.test_user_id, {"location": "48.8566,2.3522"})
+        self.assertEqual(other_db.version, self.user_db.version)
+        self.assertNotEqual(main._evaluation_key(other_db, self.test_user_id, login_input), key)
+        
+        # A changed database version misses the cache
+        self.user_db.add_trusted_device(self.test_user_id, "Other Device")
+        self.assertNotEqual(main._evaluation_key(self.user_db, self.test_user_id, login_input), key)
+    
+    def test_password_hashing(self):
+        """Test password hashing and cached verification"""
+        password_hash, salt = hash_password("correct horse")
+        self.assertEqual(len(password_hash), 32)
+        self.assertTrue(verify_password("correct horse", password_hash, salt))
+        # A repeat hits the result cache and still verifies
+        self.assertTrue(verify_password("correct horse", password_hash, salt))
+        self.assertFalse(verify_password("wrong horse", password_hash, salt))
+        self.assertFalse(verify_password("correct horse", password_hash, b"other_salt"))
+        # A changed stored hash is checked again rather than served from the cache
+        self.assertFalse(verify_password("correct horse", bytes(32), salt))
+        
+        # Bytes and non-ASCII text hash the same as their UTF-8 form
+        self.assertTrue(verify_password(b"correct horse", password_hash, salt))
+        password_hash, salt = hash_password("contraseña")
+        self.assertTrue(verify_password("contraseña".encode("utf-8"), password_hash, salt))
+    
+    def test_swar_base64_encoding(self):
+        """Test the SWAR base64 encoder against the standard library"""
+        data = bytes(range(256)) * 3
+        for length in (0, 1, 2, 3, 4, 5, 767, 768):
+            self.assertEqual(_b64_swar.b64encode(data[:length]), base64.b64encode(data[:length]))
+    
+    def test_biometric_decode_into_buffer(self):
+        """Test chunked biometric decoding into a reused buffer"""
+        data = bytes(range(256)) * 1000 + b"x"
+        encoded = encode_biometric_data(data)
+        out = bytearray(len(encoded) * 3 // 4)
+        length = decode_biometric_data_into(encoded, out)
+        self.assertEqual(bytes(out[:length]), data)
+        
+        length = decode_biometric_data_into(encode_biometric_data(b"face"), out)
+        self.assertEqual(bytes(out[:length]), b"face")
+        with self.assertRaises(ValueError):
+            decode_biometric_data_into(encoded, bytearray(10))
+    
+    def test_sensitive_data_encryption(self):
+        """Test AES-GCM encryption round trips and rejects the wrong key"""
+        encrypted = encrypt_sensitive_data("4111 1111 1111 1111", b"key")
+        self.assertNotIn("4111", encrypted)
+        self.assertNotEqual(encrypt_sensitive_data("4111 1111 1111 1111", b"key"), encrypted)
+        self.assertEqual(decrypt_sensitive_data(encrypted, b"key"), "4111 1111 1111 1111")
+        self.assertEqual(decrypt_sensitive_data(encrypted, b"other"), "DECRYPTION_FAILED")
+        self.assertTrue(base64.b64decode(encrypted).startswith(b"ENC1"))
+        self.assertEqual(decrypt_sensitive_data(base64.b64encode(b"ENC1").decode(), b"key"),
+                         "DECRYPTION_FAILED")
+        # Data without the header is rejected
+        without_header = base64.b64encode(base64.b64decode(encrypted)[4:]).decode()
+        self.assertEqual(decrypt_sensitive_data(without_header, b"key"), "DECRYPTION_FAILED")
+    
     def test_ai_verification(self):
         """Test AI verification functions"""
         # Test face verification
@@ -122,6 +240,112 @@ class TestAuthentication(unittest.TestCase):
         self.assertIsInstance(device_result, bool)
         self.assertIsInstance(device_risk, float)
     
+    def test_ai_batch_verification(self):
+        """Test batched AI verification functions"""
+        pairs = [("test_face_data", "test_face_data")] * 8
+        results, confidence = self.ai_engine.verify_face_batch(pairs)
+        self.assertEqual(results.shape, (8,))
+        self.assertEqual(confidence.shape, (8,))
+        self.assertTrue(((confidence >= 0.7) & (confidence <= 0.99)).all())
+        
+        # Trusted devices always get the fixed low risk score
+        samples = [("Test Device", ["Test Device"]), ("Other Device", ["Test Device"])]
+        results, risk_scores = self.ai_engine.verify_device_batch(samples)
+        self.assertTrue(results[0])
+        self.assertAlmostEqual(risk_scores[0], 0.2)
+        
+        stats = self.ai_engine.get_verification_stats()
+        self.assertEqual(stats["total_attempts"], 10)
+        
+        # The score vector gives the same risk as the per-factor results
+        scores = np.full(len(AIEngine.FACTORS), np.nan)
+        scores[AIEngine.FACTOR_FACE] = 0.9
+        scores[AIEngine.FACTOR_DEVICE] = 0.2
+        self.assertAlmostEqual(
+            self.ai_engine.predict_risk_level_vec(scores),
+            self.ai_engine.predict_risk_level({"face": (True, 0.9), "device": (True, 0.2)})
+        )
+        self.assertEqual(self.ai_engine.predict_risk_level_vec(np.full(4, np.nan)), 0.9)
+    
+    def test_face_embedding_verification(self):
+        """Test face verification against enrolled embeddings"""
+        rng = np.random.default_rng(0)
+        stored = self.ai_engine.normalize_face_embeddings(rng.normal(size=(50, 64)))
+        ids = np.arange(1000, 1050)
+        
+        result, similarity, matched_id = self.ai_engine.verify_face_embedding(
+            stored[7] * 2.5, stored, ids
+        )
+        self.assertTrue(result)
+        self.assertAlmostEqual(similarity, 1.0, places=5)
+        self.assertEqual(matched_id, 1007)
+        
+        # Quantized templates find the same match with a close score
+        stored_q, scale = self.ai_engine.quantize_face_embeddings(stored)
+        self.assertEqual(stored_q.dtype, np.int8)
+        results, similarities, matched_ids = self.ai_engine.verify_face_embeddings_quantized(
+            stored[[3, 7]], stored_q, scale, ids
+        )
+        self.assertTrue(results.all())
+        self.assertEqual(matched_ids.tolist(), [1003, 1007])
+        self.assertTrue(np.allclose(similarities, 1.0, atol=0.02))
+        
+        # The engine's own index finds the same matches
+        self.ai_engine.enroll_face_embeddings(stored[:25], ids[:25])
+        self.ai_engine.enroll_face_embeddings(stored[25:], ids[25:])
+        result, similarity, matched_id = self.ai_engine.verify_face_enrolled(stored[30])
+        self.assertTrue(result)
+        self.assertEqual(matched_id, 1030)
+    
+    def test_typing_feature_analysis(self):
+        """Test keystroke feature comparison against an enrolled profile"""
+        rng = np.random.default_rng(0)
+        mean = rng.uniform(0.05, 0.3, 80).astype(np.float32)
+        inv_cov_diag = np.full(80, 1.0 / 0.02 ** 2, dtype=np.float32)
+        
+        # Packed float32 bytes matching the profile score close to 1
+        result, confidence = self.ai_engine.analyze_typing_features(
+            mean.tobytes(), mean, inv_cov_diag
+        )
+        self.assertTrue(result)
+        self.assertAlmostEqual(confidence, 1.0, places=5)
+        
+        samples = np.stack([mean + 0.01, mean + 0.2])
+        results, confidence = self.ai_engine.analyze_typing_features_batch(
+            samples, mean, inv_cov_diag
+        )
+        self.assertEqual(results.tolist(), [True, False])
+        self.assertAlmostEqual(confidence[0], 1.0 / 1.5, places=4)
+    
+    def test_location_index_verification(self):
+        """Test location verification against the nearest historical location"""
+        index = self.ai_engine.build_location_index(
+            ["48.8566,2.3522", "51.5074,-0.1278", "not a location"]
+        )
+        self.assertEqual(len(index), 2)
+        
+        # Versailles is about 17 km from Paris; Nairobi is far from both
+        results, risk_scores = self.ai_engine.verify_location_nearest_batch(
+            ["48.8049,2.1204", "1.2921,36.8219", "unknown"], index
+        )
+        self.assertEqual(results.tolist(), [True, False, False])
+        expected_km = haversine_km(np.array([48.8049, 2.1204]), np.array([48.8566, 2.3522]))
+        self.assertAlmostEqual(risk_scores[0] * AIEngine.MAX_FEASIBLE_KM, expected_km, places=6)
+        self.assertEqual(risk_scores[1:].tolist(), [1.0, 1.0])
+        
+        # The vectorized check over parsed coordinates scores the same way
+        result, risk_score = self.ai_engine.verify_location_vec("48.8049,2.1204", index.coordinates)
+        self.assertTrue(result)
+        self.assertAlmostEqual(risk_score, risk_scores[0], places=4)
+        self.assertEqual(self.ai_engine.verify_location_vec("unknown", index.coordinates), (False, 1.0))
+        results, batch_scores = self.ai_engine.verify_location_vec_batch(
+            ["48.8049,2.1204", "unknown", "48.8049,2.1204"],
+            [index.coordinates, index.coordinates, np.empty((0, 2))]
+        )
+        self.assertEqual(results.tolist(), [True, False, False])
+        self.assertAlmostEqual(batch_scores[0], risk_score)
+        self.assertEqual(batch_scores[1:].tolist(), [1.0, 1.0])
+    
     def test_user_database(self):
         """Test user database functions"""
         # Get user details
@@ -129,6 +353,27 @@ class TestAuthentication(unittest.TestCase):
         self.assertIsNotNone(user_data)
         self.assertEqual(user_data["username"], "test_user")
         
+        self.assertEqual(self.user_db.get_user_id_by_username("test_user"), self.test_user_id)
+        self.assertIsNone(self.user_db.get_user_id_by_username("nobody"))
+        
+        # Writes to a view are not seen by the database or by other callers
+        user_data["balance"] = 0.0
+        user_data["stored_face"] = "other_face_data"
+        self.assertEqual(self.user_db.users[self.test_user_id]["balance"], 1000.0)
+        other_data = self.user_db.get_user_detail(self.test_user_id)
+        self.assertIsNot(other_data, user_data)
+        self.assertEqual(other_data["balance"], 1000.0)
+        self.assertNotEqual(other_data.get("stored_face"), "other_face_data")
+        
+        # Trusted devices and login history can only change through the database
+        with self.assertRaises(AttributeError):
+            other_data["trusted_devices"].add("Other Device")
+        with self.assertRaises(TypeError):
+            other_data["historical_logins"][0]["location"] = "1.2921,36.8219"
+        self.assertFalse(self.user_db.is_trusted_device(self.test_user_id, "Other Device"))
+        self.user_db.update_user(self.test_user_id, {"balance": 2000.0})
+        self.assertEqual(self.user_db.get_user_detail(self.test_user_id)["balance"], 2000.0)
+        
         # Compare with current
         current_data = {
             "device_info": "Test Device",
@@ -137,6 +382,152 @@ class TestAuthentication(unittest.TestCase):
         comparison = self.user_db.compare_with_current(self.test_user_id, current_data)
         self.assertIsInstance(comparison, dict)
         self.assertIn("anomalies", comparison)
+    
+    def test_add_users_bulk(self):
+        """Test column-wise bulk insertion of users"""
+        user_db = self.user_db
+        added = user_db.add_users_bulk(
+            np.array([self.test_user_id, 2001, 2002]),
+            {"username": ["dup", "bulk_a", "bulk_b"],
+             "balance": np.array([1.0, 10.0, 20.0])}
+        )
+        self.assertEqual(added, 2)
+        self.assertEqual(user_db.get_user_id_by_username("bulk_b"), 2002)
+        self.assertIsInstance(user_db.users[2001]["balance"], float)
+        
+        with self.assertRaises(ValueError):
+            user_db.add_users_bulk([3001], {"username": []})
+        
+        # Login records of unknown users are skipped
+        added = user_db.add_login_records([(2001, {"location": "48.8566,2.3522"}), (3001, {})])
+        self.assertEqual(added, 1)
+        self.assertIn("timestamp", user_db.historical_logins[2001][0])
+        
+        # The in-memory database never writes a file
+        user_db.flush()
+        self.assertIsNone(user_db.login_file)
+        self.assertFalse(os.path.exists(UserDatabase.MEMORY))
+    
+    def test_login_anomalies(self):
+        """Test anomaly detection against the login summaries"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            user_db = UserDatabase(os.path.join(tmp_dir, "users.json"))
+            user_db.add_user(self.test_user_id, dict(self.test_user_data))
+            user_db.add_trusted_device(self.test_user_id, "Test Device")
+            
+            timestamp = datetime.now().isoformat()
+            user_db.add_login_record(self.test_user_id, {
+                "timestamp": timestamp, "location": "48.8566,2.3522"
+            })
+            comparison = user_db.compare_with_current(self.test_user_id, {
+                "device_info": "Test Device", "location": "1.2921,36.8219"
+            })
+            self.assertEqual(comparison["anomalies"], ["Unusual location", "Unusual login time"])
+            
+            # A second login at this hour from the same place is no longer unusual
+            user_db.add_login_record(self.test_user_id, {
+                "timestamp": timestamp, "location": "1.2921,36.8219"
+            })
+            comparison = user_db.compare_with_current(self.test_user_id, {
+                "device_info": "Test Device", "location": "1.2921,36.8219"
+            })
+            self.assertEqual(comparison["anomalies"], [])
+            
+            # Batch comparison and column analytics agree with the history
+            comparisons = user_db.compare_with_current_batch(self.test_user_id, [
+                {"device_info": "Test Device", "location": "48.8566,2.3522"},
+                {"device_info": "Other Device", "location": "51.5074,-0.1278"}
+            ])
+            self.assertEqual([c["anomalies"] for c in comparisons],
+                             [[], ["Untrusted device", "Unusual location"]])
+            hour = datetime.fromisoformat(timestamp).hour
+            self.assertEqual(user_db.get_login_hour_histogram(self.test_user_id)[hour], 2)
+            self.assertEqual(user_db.count_logins(self.test_user_id, location="1.2921,36.8219"), 1)
+            self.assertEqual(sorted(user_db.get_login_coordinates(self.test_user_id).tolist()),
+                             sorted(np.float32([[48.8566, 2.3522], [1.2921, 36.8219]]).tolist()))
+            
+            logins = user_db.logins_frame()
+            self.assertEqual(logins["user_id"].tolist(), [self.test_user_id] * 2)
+            self.assertEqual(logins["location"].tolist(), ["48.8566,2.3522", "1.2921,36.8219"])
+            self.assertEqual(user_db.typical_login_hours()[self.test_user_id], hour)
+            users = user_db.users_frame()
+            self.assertEqual(users.loc[self.test_user_id, "trusted_device_count"], 1)
+            self.assertNotIn("password_hash", users.columns)
+            
+            # The coordinates are reused until a new location is recorded
+            coordinates = user_db.get_login_coordinates(self.test_user_id)
+            self.assertIs(user_db.get_login_coordinates(self.test_user_id), coordinates)
+            user_db.add_login_record(self.test_user_id, {"timestamp": timestamp, "location": "48.8566,2.3522"})
+            self.assertIs(user_db.get_login_coordinates(self.test_user_id), coordinates)
+            user_db.add_login_record(self.test_user_id, {"timestamp": timestamp, "location": "51.5074,-0.1278"})
+            self.assertEqual(len(user_db.get_login_coordinates(self.test_user_id)), 3)
+            
+            # A None location is a missing location, never a category
+            user_db.add_login_record(self.test_user_id, {"timestamp": timestamp, "location": None})
+            self.assertTrue(user_db.logins_frame()["location"].isna().iloc[-1])
+            self.assertNotIn(None, user_db.logins_frame()["location"].cat.categories)
+            
+            # Records with an unhashable location are rejected
+            with self.assertLogs("app.models.user_database", level="WARNING"):
+                self.assertFalse(user_db.add_login_record(self.test_user_id, {"location": [48.8566, 2.3522]}))
+                self.assertEqual(user_db.add_login_records([
+                    (self.test_user_id, {"location": [48.8566, 2.3522]}),
+                    (self.test_user_id, {"location": "48.8566,2.3522"})
+                ]), 1)
+            
+            # An unhashable location being checked is an unknown location
+            with self.assertLogs("app.models.user_database", level="WARNING"):
+                comparison = user_db.compare_with_current(self.test_user_id, {
+                    "device_info": "Test Device", "location": [48.8566, 2.3522]
+                })
+                self.assertIn("Unusual location", comparison["anomalies"])
+                comparisons = user_db.compare_with_current_batch(self.test_user_id, [
+                    {"device_info": "Test Device", "location": [48.8566, 2.3522]}
+                ])
+                self.assertIn("Unusual location", comparisons[0]["anomalies"])
+                self.assertEqual(user_db.count_logins(self.test_user_id, location=[48.8566, 2.3522]), 0)
+    
+    def test_user_database_persistence(self):
+        """Test write-behind saving and reloading of the user database"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, "users.json")
+            user_db = UserDatabase(data_file)
+            user_db.add_user(self.test_user_id, dict(self.test_user_data))
+            user_db.add_trusted_device(self.test_user_id, "Test Device")
+            
+            # Changes are buffered until enough accumulate or flush is called
+            self.assertFalse(os.path.exists(data_file))
+            user_db.flush()
+            self.assertTrue(os.path.exists(data_file))
+            
+            # Login records are appended to the login file immediately; the
+            # caller's dict is left as given and only the record is written
+            login_data = {"location": "48.8566,2.3522"}
+            user_db.add_login_record(self.test_user_id, login_data)
+            self.assertEqual(login_data, {"location": "48.8566,2.3522"})
+            self.assertTrue(os.path.exists(user_db.login_file))
+            with open(user_db.login_file, "rb") as f:
+                self.assertNotIn(b"_hour", f.read())
+            
+            reloaded = UserDatabase(data_file).get_user_detail(self.test_user_id)
+            self.assertEqual(reloaded["password_hash"], b"fake_hash")
+            self.assertEqual(reloaded["trusted_devices"], {"Test Device"})
+            self.assertTrue(user_db.is_trusted_device(self.test_user_id, "Test Device"))
+            self.assertFalse(user_db.is_trusted_device(self.test_user_id, "Other Device"))
+            self.assertTrue(user_db.match_device(self.test_user_id, "Test"))
+            index = user_db.get_trusted_device_index(self.test_user_id)
+            self.assertIs(user_db.get_trusted_device_index(self.test_user_id), index)
+            user_db.add_trusted_device(self.test_user_id, "Other Device")
+            self.assertTrue(user_db.match_device(self.test_user_id, "Other"))
+            self.assertEqual(reloaded["historical_logins"][0]["location"], "48.8566,2.3522")
+            # A missing timestamp is filled in as a datetime and reloaded as the same datetime
+            timestamp = user_db.historical_logins[self.test_user_id][0]["timestamp"]
+            self.assertIsInstance(timestamp, datetime)
+            self.assertEqual(reloaded["historical_logins"][0]["timestamp"], timestamp)
+            # ISO strings are stored as datetimes too
+            user_db.add_login_record(self.test_user_id, {"timestamp": timestamp.isoformat()})
+            self.assertEqual(user_db.historical_logins[self.test_user_id][1]["timestamp"], timestamp)
+            user_db.close()
 
 
 if __name__ == "__main__":
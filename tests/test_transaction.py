@@ -0,0 +1,87 @@
+"""
+Tests for transactions
+"""
+import unittest
+from app.models.transaction import Transaction
+from app.models.transaction_table import TransactionTable
+from app.security.transaction_scoring import (
+    RISK_LARGE_AMOUNT, RISK_UNUSUAL_TIME, score_transaction, score_transactions, decode_risk_factors
+)
+
+
+class TestTransaction(unittest.TestCase):
+    """Test cases for transactions"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.transaction = Transaction(
+            sender_id=1001,
+            receiver_id=1002,
+            amount=250.0,
+            description="Test payment"
+        )
+    
+    def test_serialization_round_trip(self):
+        """Test to_dict and from_dict"""
+        self.assertTrue(self.transaction.complete())
+        data = self.transaction.to_dict()
+        self.assertIn("completed_at", data["metadata"])
+        self.assertEqual(data["timestamp"], self.transaction.timestamp.isoformat())
+        
+        restored = Transaction.from_dict(data)
+        self.assertEqual(restored.timestamp, self.transaction.timestamp)
+        self.assertEqual(restored.to_dict(), data)
+        
+        records = [data, Transaction(1002, 1001, 5.0).to_dict()]
+        restored = Transaction.from_records(records)
+        self.assertEqual([transaction.to_dict() for transaction in restored], records)
+    
+    def test_final_dict_cache(self):
+        """Test that final transactions reuse their dictionary"""
+        pending = self.transaction.to_dict()
+        self.assertIsNot(self.transaction.to_dict(), pending)
+        
+        self.assertTrue(self.transaction.block("Suspicious"))
+        blocked = self.transaction.to_dict()
+        self.assertIs(self.transaction.to_dict(), blocked)
+        
+        # Failing a blocked transaction changes it, so the cache is rebuilt
+        self.assertTrue(self.transaction.fail("Declined"))
+        failed = self.transaction.to_dict()
+        self.assertEqual(failed["status"], Transaction.STATUS_FAILED)
+        self.assertIn("failure_reason", failed["metadata"])
+    
+    def test_transaction_table(self):
+        """Test column storage and row materialization"""
+        table = TransactionTable(capacity=2)
+        risky = Transaction(sender_id=1002, receiver_id=1001, amount=9000.0)
+        risky.flag_for_review(0.9)
+        
+        table.extend([self.transaction, risky, Transaction(1001, 1003, 10.0)])
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.compute_risk_mask(0.5).tolist(), [False, True, False])
+        
+        row = table.row(1)
+        self.assertEqual(row.transaction_id, risky.transaction_id)
+        self.assertEqual(row.status, Transaction.STATUS_UNDER_REVIEW)
+        self.assertEqual(row.amount, 9000.0)
+        self.assertEqual(row.timestamp, risky.timestamp)
+    
+    def test_risk_scoring(self):
+        """Test scalar and batch transaction scoring agree"""
+        score, mask = score_transaction(9000.0, 3, False, 5000.0)
+        self.assertAlmostEqual(score, 0.5)
+        self.assertEqual(mask, RISK_LARGE_AMOUNT | RISK_UNUSUAL_TIME)
+        self.assertEqual(decode_risk_factors(mask), ["Large transaction amount", "Unusual transaction time"])
+        
+        amounts = [9000.0, 100.0, 100.0]
+        hours = [3, 12, 1]
+        new_receivers = [False, True, False]
+        scores, masks = score_transactions(amounts, hours, new_receivers, 5000.0)
+        expected = [score_transaction(*args, 5000.0) for args in zip(amounts, hours, new_receivers)]
+        self.assertEqual(scores.tolist(), [s for s, _ in expected])
+        self.assertEqual(masks.tolist(), [m for _, m in expected])
+
+
+if __name__ == "__main__":
+    unittest.main()